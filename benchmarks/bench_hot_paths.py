@@ -0,0 +1,363 @@
+"""Micro-benchmarks for the parsing and query hot paths.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_hot_paths.py           # compare with baselines.json
+    python benchmarks/bench_hot_paths.py --check   # exit with 1 on a regression
+    python benchmarks/bench_hot_paths.py --save    # record new baselines
+
+Every benchmark reports the best time per operation over several repeats.
+Portal responses come from the fixtures in ``fixtures/`` (see
+portal_fixtures.py) and are served by an in-process client, so no network is
+involved. Baselines are machine specific: record them on the machine that
+runs the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
+from datetime import timedelta
+from itertools import cycle
+import json
+import logging
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.update_coordinator import UpdateFailed  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from multidict import CIMultiDict, CIMultiDictProxy  # noqa: E402
+
+from custom_components.wywoz_odpadow.address_index import AddressIndex  # noqa: E402
+from custom_components.wywoz_odpadow.api import (  # noqa: E402
+    ApiResponse,
+    WywozOdpadowApiClient,
+)
+from custom_components.wywoz_odpadow.autocomplete import AutocompleteCache  # noqa: E402
+from custom_components.wywoz_odpadow.calendar import WywozOdpadowCalendar  # noqa: E402
+from custom_components.wywoz_odpadow.config_flow import search_addresses  # noqa: E402
+from custom_components.wywoz_odpadow.const import (  # noqa: E402
+    DATA_ADDRESS_INDEX,
+    DATA_API_CLIENT,
+    DATA_AUTOCOMPLETE_CACHE,
+    SCHEDULE_CONTEXT,
+)
+from custom_components.wywoz_odpadow.coordinator import (  # noqa: E402
+    WywozOdpadowDataUpdateCoordinator,
+)
+from custom_components.wywoz_odpadow.history import async_get_history  # noqa: E402
+from custom_components.wywoz_odpadow.ics import IcsFeedView  # noqa: E402
+from custom_components.wywoz_odpadow.localization import (  # noqa: E402
+    async_get_fraction_translations,
+)
+from custom_components.wywoz_odpadow.sensor import (  # noqa: E402
+    WywozOdpadowFractionSensor,
+)
+from portal_fixtures import (  # noqa: E402
+    PortalResponse,
+    autocomplete_payload,
+    responses,
+    synthetic_payload,
+)
+
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+# A benchmark is reported as a regression above this ratio to its baseline
+REGRESSION_RATIO = 1.3
+REPEAT = 5
+# Target duration of one repeat, used to pick the number of operations
+TARGET_SECONDS = 0.2
+
+FRACTION_TRANSLATIONS = {
+    "ZM": "Mixed waste",
+    "MT": "Metals and plastics",
+    "OP": "Paper",
+    "OS": "Glass",
+    "BK": "Bio waste",
+    "OZ": "Green waste",
+    "WG": "Bulky waste",
+}
+
+
+def use_fraction_translations(hass: HomeAssistant) -> None:
+    """Serve FRACTION_TRANSLATIONS from the shared translation cache."""
+    cache = async_get_fraction_translations(hass)
+    cache._translations[hass.config.language] = dict(FRACTION_TRANSLATIONS)
+
+
+class FixtureClient(WywozOdpadowApiClient):
+    """API client answering every request with a canned response."""
+
+    def __init__(self, hass: HomeAssistant, response: PortalResponse) -> None:
+        """Initialize with the response to return."""
+        super().__init__(hass)
+        self.response = response
+
+    async def async_fetch(self, url: str, timeout: float) -> ApiResponse:
+        """Return the canned response."""
+        headers = CIMultiDictProxy(CIMultiDict({"Content-Type": self.response.content_type}))
+        return ApiResponse(self.response.status, headers, self.response.body)
+
+
+def _number_for(duration: float) -> int:
+    """Return how many operations fill one repeat."""
+    return max(1, min(100_000, int(TARGET_SECONDS / max(duration, 1e-7))))
+
+
+def time_sync(func: Callable[[], Any]) -> float:
+    """Return the best time per call of a synchronous function."""
+    start = time.perf_counter()
+    func()
+    number = _number_for(time.perf_counter() - start)
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+async def time_async(func: Callable[[], Awaitable[Any]]) -> float:
+    """Return the best time per call of a coroutine function."""
+    start = time.perf_counter()
+    await func()
+    number = _number_for(time.perf_counter() - start)
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+async def run_benchmarks(hass: HomeAssistant) -> dict[str, float]:
+    """Run all benchmarks and return seconds per operation by name."""
+    canned = responses()
+    results: dict[str, float] = {}
+
+    def record(name: str, seconds: float) -> None:
+        results[name] = seconds
+        print(f"{name:<45} {seconds * 1e6:>12.2f} us", flush=True)
+
+    use_fraction_translations(hass)
+    # Past events of the processed schedules are archived, as in an entry
+    await async_get_history(hass).async_load()
+    coordinator = WywozOdpadowDataUpdateCoordinator(hass, 1)
+    coordinator._fraction_translations = dict(FRACTION_TRANSLATIONS)
+    recorded = json.loads(canned["schedule"].body)
+    synthetic = synthetic_payload(10_000)
+
+    # Processing and translation
+    record("process_data[recorded]", time_sync(lambda: coordinator._process_data(recorded)))
+    record(
+        "process_data[synthetic_10000]",
+        time_sync(lambda: coordinator._process_data(synthetic)),
+    )
+    fractions = [
+        (item["frakcja"]["id_frakcja"], item["frakcja"]["nazwa"])
+        for item in recorded[0]["harmonogramy"]
+    ]
+
+    def translate_all() -> None:
+        for fraction_id, fraction_name in fractions:
+            coordinator._translate_fraction(fraction_id, fraction_name)
+
+    record(
+        "translate_fraction[per_call]",
+        time_sync(translate_all) / len(fractions),
+    )
+
+    # Fetch, sniff, decode and process a portal response
+    for name in ("schedule", "schedule_wrong_content_type", "html_error_page"):
+        hass.data[DATA_API_CLIENT] = FixtureClient(hass, canned[name])
+
+        async def fetch() -> None:
+            coordinator._payload_hash = None
+            try:
+                await coordinator.async_fetch_schedule()
+            except UpdateFailed:
+                pass
+
+        record(f"fetch_schedule[{name}]", await time_async(fetch))
+
+    hass.data[DATA_API_CLIENT] = FixtureClient(hass, canned["schedule"])
+    coordinator.data = await coordinator.async_fetch_schedule()
+    record(
+        "fetch_schedule[unchanged]",
+        await time_async(coordinator.async_fetch_schedule),
+    )
+
+    # Entity properties and calendar queries
+    entry = SimpleNamespace(entry_id="bench", title=recorded[0]["adres"])
+    calendar = WywozOdpadowCalendar(coordinator, entry)
+    sensor = WywozOdpadowFractionSensor(coordinator, entry, "MT", "MT")
+
+    def rebuild_event() -> None:
+        calendar._indexed_data = None
+        calendar.event  # noqa: B018
+
+    record("calendar.event[index_rebuild]", time_sync(rebuild_event))
+    record("calendar.event", time_sync(lambda: calendar.event))
+    now = dt_util.now()
+    for label, days in (("week", 7), ("month", 31), ("year", 366)):
+        end = now + timedelta(days=days)
+        record(
+            f"calendar.async_get_events[{label}]",
+            await time_async(lambda end=end: calendar.async_get_events(hass, now, end)),
+        )
+    past = now - timedelta(days=366)
+    record(
+        "calendar.async_get_events[past_year]",
+        await time_async(lambda: calendar.async_get_events(hass, past, now)),
+    )
+    record("sensor.native_value", time_sync(lambda: sensor.native_value))
+    record(
+        "sensor.extra_state_attributes",
+        time_sync(lambda: sensor.extra_state_attributes),
+    )
+
+    # Listener fan-out of refreshes that each moved one fraction's countdown
+    current = coordinator.data
+    moved = {
+        **current,
+        "fractions": {
+            **current["fractions"],
+            "MT": replace(current["fractions"]["MT"], days_until=-1),
+        },
+    }
+    notified = []
+    for context in (SCHEDULE_CONTEXT, *current["fractions"]):
+        coordinator.async_add_listener(lambda context=context: notified.append(context), context)
+    versions = cycle((moved, current))
+    coordinator.async_update_listeners()
+
+    def notify_one_fraction() -> None:
+        coordinator.data = next(versions)
+        coordinator.async_update_listeners()
+
+    record(
+        "coordinator.update_listeners[one_fraction]",
+        time_sync(notify_one_fraction),
+    )
+    notified.clear()
+    notify_one_fraction()
+    assert notified == ["MT"], notified
+
+    # iCalendar feed of a new data version, and of an unchanged one
+    view = IcsFeedView(hass)
+
+    def render_feed() -> None:
+        view._documents.clear()
+        view._events.clear()
+        view._document("bench", "bench", [coordinator])
+
+    record("ics_feed[render]", time_sync(render_feed))
+    record("ics_feed[cached]", time_sync(lambda: view._document("bench", "bench", [coordinator])))
+
+    # Autocomplete parsing, bypassing the autocomplete cache and address index
+    hass.data[DATA_API_CLIENT] = FixtureClient(hass, canned["autocomplete"])
+
+    async def search() -> None:
+        hass.data.pop(DATA_AUTOCOMPLETE_CACHE, None)
+        index_loaded = hass.loop.create_future()
+        index_loaded.set_result(AddressIndex(hass))
+        hass.data[DATA_ADDRESS_INDEX] = index_loaded
+        await search_addresses(hass, "02-715")
+
+    record("search_addresses[autocomplete]", await time_async(search))
+
+    # Narrower query answered by filtering a cached broader one
+    addresses = autocomplete_payload()
+    narrower = "Puławska 131, 02-715"
+    cache = AutocompleteCache()
+    cache.put("02-715", addresses, complete=True)
+
+    def filtered_get() -> None:
+        cache._entries.pop(narrower.lower(), None)
+        cache.get(narrower)
+
+    record("autocomplete_cache.get[filtered]", time_sync(filtered_get))
+    assert cache.get(narrower) == addresses[:1], cache.get(narrower)
+    # A possibly truncated result must not answer narrower queries
+    truncated = AutocompleteCache()
+    truncated.put("02-715", addresses, complete=False)
+    assert truncated.get(narrower) is None
+    return results
+
+
+def compare(results: dict[str, float], baselines: dict[str, float]) -> list[str]:
+    """Print the ratio to the baselines and return the regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'now':>12} {'ratio':>7}")
+    for name, seconds in results.items():
+        if (baseline := baselines.get(name)) is None:
+            print(f"{name:<45} {'-':>12} {seconds * 1e6:>10.2f}us {'new':>7}")
+            continue
+        ratio = seconds / baseline
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        print(
+            f"{name:<45} {baseline * 1e6:>10.2f}us {seconds * 1e6:>10.2f}us "
+            f"{ratio:>7.2f}{flag}"
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+async def main() -> int:
+    """Run the benchmarks and compare with or save the baselines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="record new baselines")
+    parser.add_argument(
+        "--check", action="store_true", help="exit with 1 if a benchmark regressed"
+    )
+    args = parser.parse_args()
+
+    # Error paths log on every call
+    logging.getLogger("custom_components.wywoz_odpadow").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results = await run_benchmarks(hass)
+
+    if args.save:
+        BASELINES.write_text(
+            json.dumps(
+                {
+                    "environment": {
+                        "python": platform.python_version(),
+                        "homeassistant": HA_VERSION,
+                        "machine": platform.machine(),
+                    },
+                    "seconds_per_op": {
+                        name: float(f"{seconds:.4g}") for name, seconds in results.items()
+                    },
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nSaved baselines to {BASELINES}")
+        return 0
+
+    if not BASELINES.exists():
+        print("\nNo baselines recorded yet, run with --save")
+        return 0
+    baselines = json.loads(BASELINES.read_text())["seconds_per_op"]
+    regressions = compare(results, baselines)
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+"""Memory held by processed schedules for many address points.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_memory.py --addresses 1000
+
+Processes the recorded schedule once per address point and measures the
+memory retained by the resulting coordinator data with tracemalloc, for the
+columnar schedules used by the integration and for the previous layout of one
+6-key dict per event and one dict per fraction (rebuilt from the schedules).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from datetime import date
+import gc
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.wywoz_odpadow.coordinator import (  # noqa: E402
+    WywozOdpadowDataUpdateCoordinator,
+)
+from bench_hot_paths import FRACTION_TRANSLATIONS  # noqa: E402
+from portal_fixtures import schedule_payload  # noqa: E402
+
+
+def dict_layout(data: dict[str, Any], dates: dict[date, date]) -> dict[str, Any]:
+    """Return the data in the dict-per-event layout used before the columnar schedules.
+
+    Date objects are shared through the dates dict, like the parse cache of
+    the coordinator shared them.
+    """
+    descriptions = {
+        fraction_id: f"Wywóz: {fraction.name}"
+        for fraction_id, fraction in data["fractions"].items()
+    }
+    return {
+        "address": data["address"],
+        "district": data["district"],
+        "events": [
+            {
+                "start": dates.setdefault(event.start, event.start),
+                "end": dates.setdefault(event.start, event.start),
+                "summary": event.summary,
+                "description": descriptions[event.fraction_id],
+                "fraction_id": event.fraction_id,
+                "fraction_name": event.summary,
+            }
+            for event in data["events"]
+        ],
+        "fractions": {
+            fraction_id: {
+                "id": fraction_id,
+                "name": fraction.name,
+                "type": fraction.type,
+                "next_date": fraction.next_date.isoformat() if fraction.next_date else None,
+                "days_until": fraction.days_until,
+            }
+            for fraction_id, fraction in data["fractions"].items()
+        },
+    }
+
+
+def retained(build: Callable[[int], Any], addresses: int) -> tuple[int, Any]:
+    """Return the bytes retained by building data for every address point."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(index) for index in range(addresses)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+async def main() -> None:
+    """Run the measurement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        coordinator = WywozOdpadowDataUpdateCoordinator(hass, 1)
+        coordinator._fraction_translations = dict(FRACTION_TRANSLATIONS)
+        payload = schedule_payload()
+
+        def build_payload(index: int) -> list[dict[str, Any]]:
+            return [dict(payload[0], adres=f"Puławska {index}")]
+
+        payloads = [build_payload(index) for index in range(args.addresses)]
+        # Warm the date and label caches shared by all address points
+        coordinator._process_data(payloads[0])
+
+        records, kept = retained(
+            lambda index: coordinator._process_data(payloads[index]), args.addresses
+        )
+        events = sum(len(data["events"]) for data in kept)
+        dates: dict[date, date] = {}
+        dict_layout(kept[0], dates)
+        dicts, _ = retained(lambda index: dict_layout(kept[index], dates), args.addresses)
+
+    print(f"address points        {args.addresses}")
+    print(f"events                {events}")
+    print(f"dict per event        {dicts / 1024 / 1024:>8.2f} MB ({dicts / events:.0f} B/event)")
+    print(f"columnar schedule     {records / 1024 / 1024:>8.2f} MB ({records / events:.0f} B/event)")
+    print(f"saved                 {(dicts - records) / 1024 / 1024:>8.2f} MB ({1 - records / dicts:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
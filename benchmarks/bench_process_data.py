@@ -0,0 +1,50 @@
+"""Scaling benchmark for WywozOdpadowDataUpdateCoordinator._process_data.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_process_data.py
+
+Builds synthetic portal payloads with an increasing number of harmonogramy
+entries and prints the processing time per entry, which should stay flat
+(linear scaling) as the payload grows.
+"""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.wywoz_odpadow.coordinator import (  # noqa: E402
+    WywozOdpadowDataUpdateCoordinator,
+)
+from portal_fixtures import synthetic_payload  # noqa: E402
+
+SIZES = (1_000, 5_000, 10_000, 20_000, 50_000)
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        coordinator = WywozOdpadowDataUpdateCoordinator(hass, 1)
+
+        print(f"{'entries':>8} {'total ms':>10} {'us/entry':>9}")
+        for size in SIZES:
+            payload = synthetic_payload(size)
+            runs = max(3, 200_000 // size)
+            best = min(
+                timeit.repeat(
+                    lambda: coordinator._process_data(payload), number=runs, repeat=5
+                )
+            ) / runs
+            print(f"{size:>8} {best * 1000:>10.2f} {best / size * 1e6:>9.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""End-to-end load harness running many coordinators against the stand-in portal.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/load_harness.py --coordinators 500 --rounds 3 --latency 0.2
+
+Starts StandinPortal in-process, points the integration's API client at it and
+refreshes every coordinator concurrently for a number of rounds. Reports
+refresh throughput, p50/p99 refresh latency, success ratio, requests seen by
+the stand-in, peak memory and how long the event loop was blocked.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.wywoz_odpadow.api import async_get_api_client  # noqa: E402
+from custom_components.wywoz_odpadow.const import DATA_HUB  # noqa: E402
+from custom_components.wywoz_odpadow.coordinator import (  # noqa: E402
+    WywozOdpadowDataUpdateCoordinator,
+)
+from custom_components.wywoz_odpadow.hub import WywozOdpadowHub  # noqa: E402
+from bench_hot_paths import use_fraction_translations  # noqa: E402
+from standin_portal import StandinConfig, StandinPortal, add_config_arguments  # noqa: E402
+
+# Event loop lag sampling interval and the lag counted as blocking (seconds)
+LAG_INTERVAL = 0.01
+LAG_THRESHOLD = 0.005
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a periodic sleeper."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.max_lag = 0.0
+        self.blocked = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Sleep repeatedly and record the oversleep."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = time.perf_counter() - start - LAG_INTERVAL
+            self.max_lag = max(self.max_lag, lag)
+            if lag > LAG_THRESHOLD:
+                self.blocked += lag
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the pct-th percentile of the values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the load test and print the report."""
+    portal = StandinPortal(
+        StandinConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            html_rate=args.html_rate,
+            wrong_content_type_rate=args.wrong_content_type_rate,
+            etag=args.etag,
+            seed=args.seed,
+        )
+    )
+    base_url = await portal.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        client = async_get_api_client(hass)
+        client.base_url = base_url
+        hass.data[DATA_HUB] = WywozOdpadowHub(hass, args.max_concurrent_fetches)
+        use_fraction_translations(hass)
+
+        address_points = args.address_points or args.coordinators
+        coordinators = []
+        for index in range(args.coordinators):
+            coordinator = WywozOdpadowDataUpdateCoordinator(
+                hass, 100_000 + index % address_points
+            )
+            coordinators.append(coordinator)
+
+        latencies: list[float] = []
+        successes = 0
+
+        async def refresh(coordinator: WywozOdpadowDataUpdateCoordinator) -> None:
+            nonlocal successes
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            latencies.append(time.perf_counter() - start)
+            successes += coordinator.last_update_success
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        monitor = LoopLagMonitor()
+        monitor.start()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(refresh(coordinator) for coordinator in coordinators))
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        tracemalloc.stop()
+
+        await client.async_close()
+    await portal.async_stop()
+
+    refreshes = len(latencies)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+    print(f"coordinators          {args.coordinators} ({address_points} address points)")
+    print(f"rounds                {args.rounds}")
+    print(f"refreshes             {refreshes} in {elapsed:.2f} s")
+    print(f"throughput            {refreshes / elapsed:.1f} refreshes/s")
+    print(f"success ratio         {successes / refreshes:.3f}")
+    print(f"latency p50           {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latency p99           {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"latency mean          {statistics.fmean(latencies) * 1000:.1f} ms")
+    print(f"portal requests       {dict(portal.requests)}")
+    print(f"client stats          {client.stats}")
+    print(f"peak RSS              {max_rss_mb:.1f} MB")
+    if traced_peak is not None:
+        print(f"peak traced memory    {traced_peak / 1024 / 1024:.1f} MB")
+    print(f"loop max lag          {monitor.max_lag * 1000:.1f} ms")
+    print(f"loop blocked          {monitor.blocked * 1000:.1f} ms (lags > {LAG_THRESHOLD * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coordinators", type=int, default=300)
+    parser.add_argument(
+        "--address-points",
+        type=int,
+        default=0,
+        help="distinct address points (default: one per coordinator)",
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-concurrent-fetches", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=19115)
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="also trace Python allocations (slower)"
+    )
+    add_config_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""Portal response fixtures shared by the benchmarks.
+
+The files in ``fixtures/`` follow the format of the warszawa19115.pl
+responses: a yearly schedule for one address point, an autocomplete answer for
+one postal code and the HTML error page the portal serves instead of JSON when
+it is failing. Schedule dates are shifted by whole weeks so that the fixture
+always starts at the current week, keeping results comparable over time.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+import json
+from pathlib import Path
+from typing import Any
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# First week covered by schedule_mokotow.json
+SCHEDULE_START = date(2026, 1, 2)
+
+
+@dataclass(frozen=True)
+class PortalResponse:
+    """A canned portal response."""
+
+    status: int
+    content_type: str
+    body: bytes
+
+
+def schedule_payload(today: date | None = None) -> list[dict[str, Any]]:
+    """Return the recorded schedule moved to start in the current week."""
+    today = today or date.today()
+    shift = timedelta(days=(today - SCHEDULE_START).days // 7 * 7)
+    payload = json.loads((FIXTURES / "schedule_mokotow.json").read_bytes())
+    for item in payload[0]["harmonogramy"]:
+        item["data"] = (date.fromisoformat(item["data"]) + shift).isoformat()
+    return payload
+
+
+def autocomplete_payload() -> list[dict[str, str]]:
+    """Return the recorded autocomplete answer for 02-715."""
+    return json.loads((FIXTURES / "autocomplete_02-715.json").read_bytes())
+
+
+def _encode(payload: Any) -> bytes:
+    """Serialize a payload the way the portal does (compact UTF-8 JSON)."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def responses(today: date | None = None) -> dict[str, PortalResponse]:
+    """Return the canned responses by name."""
+    schedule = _encode(schedule_payload(today))
+    return {
+        "schedule": PortalResponse(200, "application/json;charset=UTF-8", schedule),
+        # The portal regularly labels JSON as HTML
+        "schedule_wrong_content_type": PortalResponse(
+            200, "text/html;charset=UTF-8", schedule
+        ),
+        "html_error_page": PortalResponse(
+            200, "text/html;charset=UTF-8", (FIXTURES / "error_page.html").read_bytes()
+        ),
+        "autocomplete": PortalResponse(
+            200, "text/html;charset=UTF-8", _encode(autocomplete_payload())
+        ),
+    }
+
+
+def synthetic_payload(entries: int, today: date | None = None) -> list[dict[str, Any]]:
+    """Return a portal-like payload with the given number of schedule entries.
+
+    The recorded fractions are cycled over consecutive days, starting a month
+    in the past like a real yearly schedule part-way through the year.
+    """
+    recorded = schedule_payload(today)[0]
+    fractions = {
+        item["frakcja"]["id_frakcja"]: item["frakcja"]
+        for item in recorded["harmonogramy"]
+    }
+    cycle = list(fractions.values())
+    start = (today or date.today()) - timedelta(days=30)
+    return [
+        {
+            "adres": recorded["adres"],
+            "dzielnicy": recorded["dzielnicy"],
+            "harmonogramy": [
+                {
+                    "data": (start + timedelta(days=i // len(cycle))).isoformat(),
+                    "frakcja": dict(cycle[i % len(cycle)]),
+                }
+                for i in range(entries)
+            ],
+        }
+    ]
@@ -0,0 +1,204 @@
+"""Local stand-in for the warszawa19115.pl schedule and autocomplete endpoints.
+
+Serves the fixtures from portal_fixtures.py on the same query parameters as
+the real portal (``p_p_resource_id`` selects the endpoint), with configurable
+latency and failure modes. Run it on its own:
+
+    python benchmarks/standin_portal.py --port 8119 --latency 0.2 --error-rate 0.05
+
+and point the integration at it by setting ``base_url`` on the API client, or
+start it in-process with StandinPortal (see load_harness.py).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+import random
+import sys
+
+from aiohttp import hdrs, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.wywoz_odpadow.const import (  # noqa: E402
+    API_AUTOCOMPLETE_RESOURCE_ID,
+    API_RESOURCE_ID,
+)
+from portal_fixtures import (  # noqa: E402
+    FIXTURES,
+    autocomplete_payload,
+    schedule_payload,
+)
+
+JSON = "application/json;charset=UTF-8"
+HTML = "text/html;charset=UTF-8"
+
+
+@dataclass
+class StandinConfig:
+    """Behaviour of the stand-in portal."""
+
+    # Response delay: latency +/- jitter seconds
+    latency: float = 0.05
+    jitter: float = 0.02
+    # Share of requests answered with a 500 and the HTML error page
+    error_rate: float = 0.0
+    # Share of requests answered with a 200 and the HTML error page
+    html_rate: float = 0.0
+    # Share of JSON responses labelled text/html (the real portal does this)
+    wrong_content_type_rate: float = 1.0
+    # Send an ETag and answer If-None-Match with 304
+    etag: bool = False
+    seed: int | None = None
+
+
+class StandinPortal:
+    """aiohttp application mimicking the portal endpoints."""
+
+    def __init__(self, config: StandinConfig | None = None) -> None:
+        """Initialize the stand-in."""
+        self.config = config or StandinConfig()
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(self.config.seed)
+        self._schedule = schedule_payload()
+        self._addresses = autocomplete_payload()
+        self._error_page = (FIXTURES / "error_page.html").read_bytes()
+        self._bodies: dict[str, bytes] = {}
+        self._runner: web.AppRunner | None = None
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        return app
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}/harmonogramy-wywozu-odpadow"
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Answer a portal request."""
+        resource_id = request.query.get("p_p_resource_id")
+        self.requests[resource_id or "unknown"] += 1
+
+        config = self.config
+        delay = config.latency + self._random.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < config.error_rate:
+            self.requests["error"] += 1
+            return web.Response(status=500, body=self._error_page, content_type="text/html")
+        if roll < config.error_rate + config.html_rate:
+            self.requests["html"] += 1
+            return web.Response(body=self._error_page, headers={hdrs.CONTENT_TYPE: HTML})
+
+        if resource_id == API_RESOURCE_ID:
+            body = self._schedule_body(_query_suffix(request, "_addressPointId"))
+        elif resource_id == API_AUTOCOMPLETE_RESOURCE_ID:
+            body = self._autocomplete_body(_query_suffix(request, "_name"))
+        else:
+            return web.Response(status=404, body=self._error_page, content_type="text/html")
+
+        headers = {
+            hdrs.CONTENT_TYPE: HTML
+            if self._random.random() < config.wrong_content_type_rate
+            else JSON
+        }
+        if config.etag:
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            headers[hdrs.ETAG] = etag
+            if request.headers.get(hdrs.IF_NONE_MATCH) == etag:
+                self.requests["not_modified"] += 1
+                return web.Response(status=304, headers={hdrs.ETAG: etag})
+        return web.Response(body=body, headers=headers)
+
+    def _schedule_body(self, address_point_id: str) -> bytes:
+        """Return the schedule of an address point (the fixture, renamed)."""
+        if (body := self._bodies.get(address_point_id)) is None:
+            payload = [dict(self._schedule[0], adres=f"Puławska {address_point_id}")]
+            body = self._bodies[address_point_id] = _encode(payload)
+        return body
+
+    def _autocomplete_body(self, query: str) -> bytes:
+        """Return the fixture addresses whose name contains the query."""
+        query = query.lower()
+        return _encode(
+            [address for address in self._addresses if query in address["fullName"].lower()]
+        )
+
+
+def _query_suffix(request: web.Request, suffix: str) -> str:
+    """Return the value of the portlet parameter ending with the suffix."""
+    for key, value in request.query.items():
+        if key.endswith(suffix):
+            return value
+    return ""
+
+
+def _encode(payload: object) -> bytes:
+    """Serialize a payload as compact UTF-8 JSON."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run the stand-in until interrupted."""
+    portal = StandinPortal(
+        StandinConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            html_rate=args.html_rate,
+            wrong_content_type_rate=args.wrong_content_type_rate,
+            etag=args.etag,
+        )
+    )
+    url = await portal.async_start(args.host, args.port)
+    print(f"Serving stand-in portal at {url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await portal.async_stop()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the StandinConfig options to an argument parser."""
+    defaults = StandinConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--html-rate", type=float, default=defaults.html_rate)
+    parser.add_argument(
+        "--wrong-content-type-rate",
+        type=float,
+        default=defaults.wrong_content_type_rate,
+    )
+    parser.add_argument("--etag", action="store_true")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8119)
+    add_config_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -8,33 +8,64 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import (
-    CONF_ADDRESS_POINT_ID,
-    CONF_UPDATE_INTERVAL,
-    DEFAULT_UPDATE_INTERVAL,
-    DOMAIN,
-)
+from .const import CONF_ADDRESS_POINT_ID, DOMAIN
 from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .history import async_get_history
+from .hub import async_get_hub
+from .ics import IcsFeedView, async_ensure_feed_token, async_setup_feed_service
+from .onboarding import async_setup_import_service
+from .profiling import async_setup_profile_service
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration-wide services and the iCalendar feeds."""
+    async_setup_profile_service(hass)
+    async_setup_import_service(hass)
+    async_setup_feed_service(hass)
+    hass.http.register_view(IcsFeedView(hass))
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Wywóz Odpadów from a config entry."""
-    coordinator = WywozOdpadowDataUpdateCoordinator(
-        hass,
-        entry.data[DOMAIN][CONF_ADDRESS_POINT_ID],
-        entry.data.get(DOMAIN, {}).get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
-    )
-
-    # Fetch initial data so we have data when the entities are set up
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:
-        raise ConfigEntryNotReady(f"Error fetching initial data: {err}") from err
+    # Entries created before the feeds had tokens get one on their next setup
+    async_ensure_feed_token(hass, entry)
+    coordinator = WywozOdpadowDataUpdateCoordinator.from_config_entry(hass, entry)
+
+    hub = async_get_hub(hass)
+    await hub.async_load_cache()
+    # Loaded before the first schedule is processed, which appends to it
+    await async_get_history(hass).async_load()
+    if (cached := hub.cached_payload(coordinator.address_point_id)) is not None:
+        # Start from the cached schedule; only refresh right away if it has no
+        # upcoming collections, otherwise the hub refreshes it in its slot
+        payload, _ = cached
+        await coordinator.async_restore_cached(payload)
+        if not coordinator.data.get("events"):
+            entry.async_create_background_task(
+                hass,
+                coordinator.async_refresh(),
+                f"{DOMAIN} refresh {coordinator.address_point_id}",
+            )
+    else:
+        # Fetch initial data so we have data when the entities are set up
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception as err:
+            raise ConfigEntryNotReady(f"Error fetching initial data: {err}") from err
+
+    # Share fetches with other entries for the same address point and let the
+    # hub schedule refreshes
+    entry.async_on_unload(hub.async_register(coordinator))
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -42,6 +73,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Entry updates also store feed tokens; only option changes need a reload
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the entry when its options changed."""
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
@@ -53,3 +94,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return unload_ok
 
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the cached schedule and history when no other entry uses the address point."""
+    address_point_id = entry.data[DOMAIN][CONF_ADDRESS_POINT_ID]
+    if not any(
+        other.data.get(DOMAIN, {}).get(CONF_ADDRESS_POINT_ID) == address_point_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        await async_get_hub(hass).async_remove_payload(address_point_id)
+        await async_get_history(hass).async_remove(address_point_id)
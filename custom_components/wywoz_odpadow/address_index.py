@@ -0,0 +1,225 @@
+"""Persistent local index of address points with fuzzy search."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import unicodedata
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ADDRESS_INDEX_MAX_QUERIES,
+    ADDRESS_INDEX_SAVE_DELAY,
+    ADDRESS_INDEX_STORAGE_KEY,
+    ADDRESS_INDEX_STORAGE_VERSION,
+    AUTOCOMPLETE_RESULT_LIMIT,
+    DATA_ADDRESS_INDEX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Share of the query's street trigrams a name must contain to be a fuzzy match
+FUZZY_MATCH_THRESHOLD = 0.6
+# Matches returned by search(); lookup() returns every match of a covered query
+MAX_RESULTS = 100
+
+_TOKEN_SPLIT = re.compile(r"[\s,./]+")
+# Letters that do not decompose under NFKD
+_FOLD = str.maketrans({"ł": "l", "Ł": "l"})
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip Polish diacritics and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text.translate(_FOLD).lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+def _tokens(text: str) -> list[str]:
+    """Split normalized text into tokens."""
+    return [token for token in _TOKEN_SPLIT.split(text) if token]
+
+
+def _trigrams(text: str) -> set[str]:
+    """Return the trigrams of a normalized text, padded at word boundaries."""
+    trigrams: set[str] = set()
+    for token in _tokens(text):
+        padded = f"  {token} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class AddressIndex:
+    """Index of addressPointId -> fullName built from autocomplete responses.
+
+    Only the id -> name mapping and the queries already answered by the portal
+    are persisted; the trigram index is rebuilt on load.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the index."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, ADDRESS_INDEX_STORAGE_VERSION, ADDRESS_INDEX_STORAGE_KEY
+        )
+        self._names: dict[str, str] = {}
+        self._normalized: dict[str, str] = {}
+        self._trigram_index: dict[str, set[str]] = {}
+        # Normalized queries for which the portal's full (not truncated) result
+        # is in the index
+        self._queries: dict[str, None] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed address points."""
+        return len(self._names)
+
+    async def async_load(self) -> None:
+        """Load the index from disk."""
+        stored = await self._store.async_load() or {}
+        for address_point_id, full_name in stored.get("addresses", {}).items():
+            self._index(address_point_id, full_name)
+        self._queries = dict.fromkeys(stored.get("queries", []))
+        _LOGGER.debug("Loaded %s indexed address points", len(self._names))
+
+    @callback
+    def async_add(self, query: str, addresses: list[dict[str, Any]]) -> None:
+        """Index an autocomplete response for a query.
+
+        The query is recorded as answered only if the response is shorter than
+        AUTOCOMPLETE_RESULT_LIMIT, since a longer one may be truncated.
+        """
+        for address in addresses:
+            address_point_id = address.get("addressPointId")
+            full_name = address.get("fullName")
+            if address_point_id is None or not full_name:
+                continue
+            self._index(str(address_point_id), str(full_name))
+
+        key = normalize(query)
+        self._queries.pop(key, None)
+        if len(addresses) < AUTOCOMPLETE_RESULT_LIMIT:
+            self._queries[key] = None
+        while len(self._queries) > ADDRESS_INDEX_MAX_QUERIES:
+            del self._queries[next(iter(self._queries))]
+
+        self._store.async_delay_save(self._data_to_save, ADDRESS_INDEX_SAVE_DELAY)
+
+    def covers(self, query: str) -> bool:
+        """Return True if the index holds the portal's whole result for this query.
+
+        The portal returns addresses whose name contains the query, so a query
+        is covered if it, or a broader query it contains, was answered in full.
+        """
+        key = normalize(query)
+        return bool(key) and any(answered in key for answered in self._queries)
+
+    def lookup(self, query: str) -> list[dict[str, str]] | None:
+        """Answer a search locally, or return None if the portal should be asked.
+
+        Only covered queries are answered, with every indexed address whose
+        name contains the query; any other answer could miss addresses the
+        portal has but the index does not.
+        """
+        if not self.covers(query):
+            return None
+        return self._results(self._containing(normalize(query))) or None
+
+    def search(self, query: str) -> tuple[list[dict[str, str]], float]:
+        """Search by street name and house number.
+
+        Names containing the query are exact matches (score 1.0). Otherwise
+        names sharing enough trigrams with the query's street part are fuzzy
+        matches; house numbers in the query must appear as tokens of the name.
+        Returns the matches (best first) and the best score.
+        """
+        key = normalize(query)
+        if not key:
+            return [], 0.0
+
+        if exact := self._containing(key):
+            return self._results(exact[:MAX_RESULTS]), 1.0
+
+        tokens = _tokens(key)
+        numbers = {token for token in tokens if any(char.isdigit() for char in token)}
+        street_trigrams = _trigrams(
+            " ".join(token for token in tokens if token not in numbers)
+        )
+        if not street_trigrams:
+            return [], 0.0
+
+        shared: dict[str, int] = {}
+        for trigram in street_trigrams:
+            for address_point_id in self._trigram_index.get(trigram, ()):
+                shared[address_point_id] = shared.get(address_point_id, 0) + 1
+
+        scored: list[tuple[float, str]] = []
+        for address_point_id, count in shared.items():
+            score = count / len(street_trigrams)
+            if score < FUZZY_MATCH_THRESHOLD:
+                continue
+            if numbers and not numbers.issubset(
+                _tokens(self._normalized[address_point_id])
+            ):
+                continue
+            scored.append((score, address_point_id))
+
+        scored.sort(key=lambda item: (-item[0], self._names[item[1]]))
+        scored = scored[:MAX_RESULTS]
+        return (
+            self._results([address_point_id for _, address_point_id in scored]),
+            scored[0][0] if scored else 0.0,
+        )
+
+    def _containing(self, key: str) -> list[str]:
+        """Return the ids of the names containing a normalized query, by name."""
+        return sorted(
+            (
+                address_point_id
+                for address_point_id, name in self._normalized.items()
+                if key in name
+            ),
+            key=self._names.__getitem__,
+        )
+
+    def _index(self, address_point_id: str, full_name: str) -> None:
+        """Add or update a single address point."""
+        if self._names.get(address_point_id) == full_name:
+            return
+        if address_point_id in self._normalized:
+            for trigram in _trigrams(self._normalized[address_point_id]):
+                self._trigram_index.get(trigram, set()).discard(address_point_id)
+        normalized = normalize(full_name)
+        self._names[address_point_id] = full_name
+        self._normalized[address_point_id] = normalized
+        for trigram in _trigrams(normalized):
+            self._trigram_index.setdefault(trigram, set()).add(address_point_id)
+
+    def _results(self, address_point_ids: list[str]) -> list[dict[str, str]]:
+        """Return matches in the shape of autocomplete results."""
+        return [
+            {"addressPointId": address_point_id, "fullName": self._names[address_point_id]}
+            for address_point_id in address_point_ids
+        ]
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the compact on-disk representation."""
+        return {"addresses": self._names, "queries": list(self._queries)}
+
+
+async def async_get_address_index(hass: HomeAssistant) -> AddressIndex:
+    """Return the integration-wide address index, loading it on first use."""
+    index_task: asyncio.Task[AddressIndex] | None = hass.data.get(DATA_ADDRESS_INDEX)
+    if index_task is None:
+
+        async def _async_load() -> AddressIndex:
+            index = AddressIndex(hass)
+            await index.async_load()
+            return index
+
+        index_task = hass.data[DATA_ADDRESS_INDEX] = hass.async_create_task(
+            _async_load(), "wywoz_odpadow address index load"
+        )
+    return await index_task
@@ -0,0 +1,493 @@
+"""API client for the Warszawa 19115 portal."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import partial
+import hashlib
+import logging
+import re
+from time import monotonic
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp import hdrs
+from multidict import CIMultiDictProxy
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util.json import json_loads
+
+from .const import (
+    API_AUTOCOMPLETE_PARAMS,
+    API_BASE_URL,
+    API_PARAMS,
+    DATA_API_CLIENT,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    RETRY_MAX_ATTEMPTS,
+)
+from .resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError, backoff_delay
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ApiResponse:
+    """Response of a portal request with the body read as bytes."""
+
+    status: int
+    headers: CIMultiDictProxy[str]
+    body: bytes
+    not_modified: bool = False
+
+    @property
+    def content_type(self) -> str:
+        """Return the lowercased Content-Type header."""
+        return self.headers.get(hdrs.CONTENT_TYPE, "").lower()
+
+
+class PortalError(StrEnum):
+    """Why a portal request did not return usable JSON."""
+
+    UNAVAILABLE = "unavailable"  # circuit breaker open
+    TIMEOUT = "timeout"
+    CANNOT_CONNECT = "cannot_connect"
+    HTTP_STATUS = "http_status"
+    NOT_JSON = "not_json"  # HTML or other content instead of JSON
+    INVALID_JSON = "invalid_json"
+    INVALID_FORMAT = "invalid_format"  # JSON, but not a list
+
+
+@dataclass(frozen=True)
+class PortalResult:
+    """Outcome of a portal JSON request: decoded data or a typed error."""
+
+    data: list[dict[str, Any]] | None = None
+    error: PortalError | None = None
+    detail: str = ""
+    response: ApiResponse | None = None
+    # sha256 of the body; with ``unchanged`` set the body was not decoded
+    body_hash: str | None = None
+    unchanged: bool = False
+    # Seconds spent decoding the body
+    decode_time: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the request succeeded."""
+        return self.error is None
+
+
+# Portlet parameter names of the schedule and autocomplete endpoints
+_PORTLET = "_portalCKMjunkschedules_WAR_portalCKMjunkschedulesportlet_INSTANCE_o5AIb2mimbRJ"
+_JSON_START = re.compile(rb"\s*[\[{]")
+
+
+def decode_json(body: bytes) -> list[dict[str, Any]] | PortalResult:
+    """Decode a response body, sniffing the buffer for JSON first.
+
+    The portal often labels JSON as text/html, so the Content-Type header is
+    not trusted. Returns the decoded list or an error result.
+    """
+    if not _JSON_START.match(body):
+        return PortalResult(
+            error=PortalError.NOT_JSON,
+            detail=(
+                "API returned HTML instead of JSON. This may indicate an invalid "
+                "address_point_id or API endpoint issue."
+            ),
+        )
+    try:
+        data = json_loads(body)
+    except ValueError as err:
+        return PortalResult(
+            error=PortalError.INVALID_JSON,
+            detail=f"API returned invalid JSON response: {err}",
+        )
+    if not isinstance(data, list):
+        return PortalResult(
+            error=PortalError.INVALID_FORMAT,
+            detail=f"Invalid response format from API, expected list, got {type(data).__name__}",
+        )
+    return data
+
+
+def _is_server_failure(status: int) -> bool:
+    """Return True for statuses that mean the portal is struggling."""
+    return status >= 500 or status == 429
+
+
+class WywozOdpadowApiClient:
+    """Integration-wide HTTP client with a pooled keep-alive session.
+
+    Every request goes through one circuit breaker and one adaptive timeout,
+    so a degraded portal is detected once for all config entries, and
+    concurrent fetches of the same URL share a single request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        limit: int = DEFAULT_CONNECTION_LIMIT,
+        limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_url: str = API_BASE_URL,
+    ) -> None:
+        """Initialize the client."""
+        self.hass = hass
+        # Portal endpoint; replaceable to run against a local stand-in
+        self.base_url = base_url
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._max_attempts = max_attempts
+        self._breaker = CircuitBreaker()
+        self._timeout = AdaptiveTimeout()
+        self._retries = 0
+        # url -> request shared by concurrent callers
+        self._inflight: dict[str, asyncio.Task[ApiResponse]] = {}
+        self._coalesced = 0
+        self._compressed_responses = 0
+        self._session: aiohttp.ClientSession | None = None
+        self._requests = 0
+        self._connections_created = 0
+        self._connections_reused = 0
+        # url -> (ETag, Last-Modified, body) of the last 200 response
+        self._validators: dict[str, tuple[str | None, str | None, bytes]] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                # Ask for compressed bodies; aiohttp decompresses transparently
+                headers={hdrs.ACCEPT_ENCODING: "gzip, deflate"},
+                trace_configs=[trace_config],
+            )
+            _LOGGER.debug(
+                "Created shared HTTP session (limit: %s, limit per host: %s)",
+                self._limit,
+                self._limit_per_host,
+            )
+        return self._session
+
+    @asynccontextmanager
+    async def get(
+        self, url: str, timeout: float, headers: dict[str, str] | None = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a single GET request through the shared session.
+
+        Used with ``async with`` exactly like ``session.get``. The request is
+        subject to the circuit breaker and the adaptive timeout (``timeout`` is
+        the upper bound) but is not retried. A response only counts as a
+        success once the block exits without error, so the body must be read
+        inside it; errors while reading it count as failures.
+        """
+        self._breaker.before_request()
+        started = monotonic()
+        try:
+            request = self.session.get(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self._timeout.timeout(timeout)),
+            )
+            response = await request.__aenter__()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self._breaker.abort_probe()
+            raise
+
+        if hdrs.CONTENT_ENCODING in response.headers:
+            self._compressed_responses += 1
+        try:
+            yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Payload errors and timeouts while reading the body
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            self._breaker.abort_probe()
+            raise
+        else:
+            self._record_response(response.status, monotonic() - started)
+        finally:
+            await request.__aexit__(None, None, None)
+
+    async def async_fetch(self, url: str, timeout: float) -> ApiResponse:
+        """Fetch a URL, sharing the request with concurrent callers for the same URL.
+
+        While a fetch of the URL is in flight, further callers await its result
+        (or error) instead of sending their own request. The first caller's
+        timeout applies to everyone.
+        """
+        if (inflight := self._inflight.get(url)) is not None:
+            self._coalesced += 1
+            _LOGGER.debug("Joining in-flight request for %s", url)
+            return await asyncio.shield(inflight)
+
+        task = self.hass.async_create_task(
+            self._async_fetch_with_retries(url, timeout), "wywoz_odpadow fetch"
+        )
+        self._inflight[url] = task
+        task.add_done_callback(partial(self._async_fetch_done, url))
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_fetch_done(self, url: str, task: asyncio.Task[ApiResponse]) -> None:
+        """Forget a finished in-flight request."""
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_fetch_with_retries(self, url: str, timeout: float) -> ApiResponse:
+        """Send a conditional GET request and return the body as bytes.
+
+        If the portal sent ETag or Last-Modified on the previous response for this
+        URL, they are sent back; a 304 answer returns the previous body with
+        ``not_modified`` set.
+
+        Connection errors, timeouts and 5xx/429 answers are retried with
+        exponential backoff and jitter. Once the attempts are used up the last
+        error is raised (or the last response returned); an open circuit
+        raises CircuitOpenError right away.
+        """
+        attempt = 0
+        while True:
+            last_attempt = attempt + 1 >= self._max_attempts
+            try:
+                response = await self._async_fetch_once(url, timeout)
+            except CircuitOpenError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if last_attempt:
+                    raise
+                _LOGGER.debug(
+                    "Request failed (attempt %s of %s): %s",
+                    attempt + 1,
+                    self._max_attempts,
+                    err or type(err).__name__,
+                )
+            else:
+                if last_attempt or not _is_server_failure(response.status):
+                    return response
+                _LOGGER.debug(
+                    "Portal returned status %s (attempt %s of %s)",
+                    response.status,
+                    attempt + 1,
+                    self._max_attempts,
+                )
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+            self._retries += 1
+
+    async def _async_fetch_once(self, url: str, timeout: float) -> ApiResponse:
+        """Send one conditional GET request."""
+        headers: dict[str, str] = {}
+        if (validators := self._validators.get(url)) is not None:
+            etag, last_modified, _ = validators
+            if etag:
+                headers[hdrs.IF_NONE_MATCH] = etag
+            if last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = last_modified
+
+        async with self.get(url, timeout, headers) as response:
+            if response.status == 304 and validators is not None:
+                return ApiResponse(200, response.headers, validators[2], True)
+            body = await response.read()
+
+        if response.status == 200:
+            etag = response.headers.get(hdrs.ETAG)
+            last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+            if etag or last_modified:
+                self._validators[url] = (etag, last_modified, body)
+            else:
+                self._validators.pop(url, None)
+
+        return ApiResponse(response.status, response.headers, body)
+
+    def schedule_url(self, address_point_id: int) -> str:
+        """Return the schedule URL of an address point."""
+        params = {**API_PARAMS, f"{_PORTLET}_addressPointId": str(address_point_id)}
+        return f"{self.base_url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+
+    def autocomplete_url(self, query: str) -> str:
+        """Return the address autocomplete URL for a query."""
+        params = dict(API_AUTOCOMPLETE_PARAMS)
+        if query:
+            params[f"{_PORTLET}_name"] = query
+        return f"{self.base_url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+
+    async def async_fetch_json(
+        self, url: str, timeout: float, unchanged_hash: str | None = None
+    ) -> PortalResult:
+        """Fetch a URL and decode its JSON list body.
+
+        The body is read once as bytes and decoded from that buffer. If
+        ``unchanged_hash`` matches the sha256 of the body, decoding is skipped
+        and the result is marked ``unchanged``. Errors are returned as typed
+        results instead of being raised.
+        """
+        try:
+            response = await self.async_fetch(url, timeout)
+        except CircuitOpenError as err:
+            return PortalResult(error=PortalError.UNAVAILABLE, detail=str(err))
+        except asyncio.TimeoutError as err:
+            _LOGGER.error("Timeout communicating with API: %s", err)
+            return PortalResult(
+                error=PortalError.TIMEOUT, detail=f"Timeout communicating with API: {err}"
+            )
+        except aiohttp.ClientError as err:
+            _LOGGER.error(
+                "Client error communicating with API: %s (type: %s)",
+                err,
+                type(err).__name__,
+            )
+            return PortalResult(
+                error=PortalError.CANNOT_CONNECT,
+                detail=f"Error communicating with API: {err}",
+            )
+
+        if response.status != 200:
+            _LOGGER.error(
+                "API returned non-200 status: %s. Response body: %s",
+                response.status,
+                response.body[:500].decode(errors="replace"),  # Limit log size
+            )
+            return PortalResult(
+                error=PortalError.HTTP_STATUS,
+                detail=f"API returned status {response.status}",
+                response=response,
+            )
+
+        body_hash: str | None = None
+        # Error pages are not hashed
+        if _JSON_START.match(response.body):
+            body_hash = hashlib.sha256(response.body).hexdigest()
+            if body_hash == unchanged_hash:
+                return PortalResult(response=response, body_hash=body_hash, unchanged=True)
+
+        decode_start = monotonic()
+        decoded = decode_json(response.body)
+        decode_time = monotonic() - decode_start
+        if isinstance(decoded, PortalResult):
+            _LOGGER.error(
+                "%s (Content-Type: %s). Response body: %s",
+                decoded.detail,
+                response.content_type,
+                response.body[:1000].decode(errors="replace"),  # Limit log size
+            )
+            return PortalResult(
+                error=decoded.error,
+                detail=decoded.detail,
+                response=response,
+                body_hash=body_hash,
+                decode_time=decode_time,
+            )
+        if "json" not in response.content_type:
+            _LOGGER.debug(
+                "Parsed JSON despite wrong Content-Type header: %s",
+                response.content_type,
+            )
+        return PortalResult(
+            data=decoded, response=response, body_hash=body_hash, decode_time=decode_time
+        )
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return connection reuse statistics."""
+        connections = self._connections_created + self._connections_reused
+        return {
+            "requests": self._requests,
+            "connections_created": self._connections_created,
+            "connections_reused": self._connections_reused,
+            "reuse_ratio": (
+                round(self._connections_reused / connections, 3) if connections else None
+            ),
+            "retries": self._retries,
+            "coalesced": self._coalesced,
+            "compressed_responses": self._compressed_responses,
+            "circuit_state": self._breaker.state,
+            "circuit_trips": self._breaker.trips,
+            "short_circuited": self._breaker.short_circuited,
+            "smoothed_latency": self._timeout.smoothed_latency,
+        }
+
+    def _record_response(self, status: int, latency: float) -> None:
+        """Feed a response into the circuit breaker and the latency estimate."""
+        if _is_server_failure(status):
+            self._breaker.record_failure()
+            return
+        self._breaker.record_success()
+        self._timeout.record(latency)
+
+    async def async_close(self) -> None:
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _on_request_start(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        """Count outgoing requests."""
+        self._requests += 1
+
+    async def _on_connection_create_end(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        """Count newly opened connections."""
+        self._connections_created += 1
+
+    async def _on_connection_reuseconn(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceConnectionReuseconnParams,
+    ) -> None:
+        """Count requests served by a pooled keep-alive connection."""
+        self._connections_reused += 1
+
+
+@callback
+def async_get_api_client(hass: HomeAssistant) -> WywozOdpadowApiClient:
+    """Return the integration-wide API client, creating it if needed."""
+    client: WywozOdpadowApiClient | None = hass.data.get(DATA_API_CLIENT)
+    if client is not None:
+        return client
+
+    client = WywozOdpadowApiClient(hass)
+    hass.data[DATA_API_CLIENT] = client
+
+    async def _async_close_client(_: Event) -> None:
+        """Close the client when Home Assistant shuts down."""
+        await client.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_client)
+    return client
@@ -0,0 +1,135 @@
+"""Domain-wide cache of address autocomplete results."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import logging
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+    AUTOCOMPLETE_CACHE_TTL,
+    DATA_AUTOCOMPLETE_CACHE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _normalize(query: str) -> str:
+    """Return the cache key for a search query."""
+    return " ".join(query.lower().split())
+
+
+class AutocompleteCache:
+    """TTL + LRU cache of autocomplete results keyed by search query.
+
+    The portal returns addresses whose full name contains the query, so a
+    narrower query (e.g. a longer postal code prefix) can be answered by
+    filtering the cached result of a broader one. Only results stored as
+    complete are filtered, since a truncated result may lack addresses of the
+    narrower query; the filtered result expires with the one it came from.
+    """
+
+    def __init__(
+        self,
+        ttl: float = AUTOCOMPLETE_CACHE_TTL,
+        max_entries: int = AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # Query -> (expiry, results, complete)
+        self._entries: OrderedDict[
+            str, tuple[float, list[dict[str, Any]], bool]
+        ] = OrderedDict()
+        self.hits = 0
+        self.filtered_hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> list[dict[str, Any]] | None:
+        """Return cached results for the query, or None on a miss."""
+        key = _normalize(query)
+        now = monotonic()
+        self._expire(now)
+
+        if (cached := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        # Answer from the longest complete cached query contained in this one
+        broader = [
+            cached_key
+            for cached_key, (_, _, complete) in self._entries.items()
+            if complete and cached_key in key
+        ]
+        if broader:
+            broadest_match = max(broader, key=len)
+            expires, cached_results, _ = self._entries[broadest_match]
+            results = [
+                address
+                for address in cached_results
+                if key in _normalize(str(address.get("fullName", "")))
+            ]
+            # An empty subset is left to the portal and the fuzzy index fallback
+            if results:
+                _LOGGER.debug(
+                    "Answered address search %r from cached results for %r",
+                    query,
+                    broadest_match,
+                )
+                self._entries.move_to_end(broadest_match)
+                self.filtered_hits += 1
+                self._store(key, expires, results, True)
+                return results
+
+        self.misses += 1
+        return None
+
+    def put(
+        self, query: str, results: list[dict[str, Any]], *, complete: bool
+    ) -> None:
+        """Store results for the query, evicting the least recently used entry.
+
+        Results that may be truncated are stored with complete=False, so they
+        are not filtered to answer narrower queries.
+        """
+        self._store(_normalize(query), monotonic() + self._ttl, results, complete)
+
+    def _store(
+        self, key: str, expires: float, results: list[dict[str, Any]], complete: bool
+    ) -> None:
+        """Store an entry under a normalized query."""
+        self._entries[key] = (expires, results, complete)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return hit statistics."""
+        hits = self.hits + self.filtered_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "filtered_hits": self.filtered_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    def _expire(self, now: float) -> None:
+        """Drop expired entries."""
+        for key in [key for key, (expires, _, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+
+
+@callback
+def async_get_autocomplete_cache(hass: HomeAssistant) -> AutocompleteCache:
+    """Return the integration-wide autocomplete cache, creating it if needed."""
+    cache: AutocompleteCache | None = hass.data.get(DATA_AUTOCOMPLETE_CACHE)
+    if cache is None:
+        cache = hass.data[DATA_AUTOCOMPLETE_CACHE] = AutocompleteCache()
+    return cache
@@ -8,11 +8,13 @@ from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DOMAIN, SCHEDULE_CONTEXT
 from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .entity import WywozOdpadowEntity
+from .history import AddressPointHistory, async_get_history
+from .models import Schedule, ScheduleEvent
 
 
 async def async_setup_entry(
@@ -26,12 +28,9 @@ async def async_setup_entry(
     async_add_entities([WywozOdpadowCalendar(coordinator, entry)])
 
 
-class WywozOdpadowCalendar(
-    CoordinatorEntity[WywozOdpadowDataUpdateCoordinator], CalendarEntity
-):
+class WywozOdpadowCalendar(WywozOdpadowEntity, CalendarEntity):
     """Representation of a Wywóz Odpadów calendar."""
 
-    _attr_has_entity_name = True
     _attr_name = "Wywóz Odpadów"
 
     def __init__(
@@ -40,103 +39,111 @@ class WywozOdpadowCalendar(
         entry: ConfigEntry,
     ) -> None:
         """Initialize the calendar."""
-        super().__init__(coordinator)
+        # Only schedule changes affect the calendar, not fraction countdowns
+        super().__init__(coordinator, entry, SCHEDULE_CONTEXT)
         self._attr_unique_id = f"{entry.entry_id}_calendar"
-        self._entry = entry
-        # Device name will be set from coordinator data or entry title
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": None,  # Will be set from coordinator data
-            "manufacturer": "Warszawa 19115",
-        }
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        # Get address from coordinator data, fallback to entry title
-        address = None
-        if self.coordinator.data and self.coordinator.data.get("address"):
-            address = self.coordinator.data["address"]
-        else:
-            # Fallback to entry title if data not yet loaded
-            address = self._entry.title
-        
-        if not address:
-            address = f"Wywóz Odpadów ({self.coordinator.address_point_id})"
-        
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": address,
-            "manufacturer": "Warszawa 19115",
-        }
-
-    @property
-    def event(self) -> CalendarEvent | None:
-        """Return the next upcoming event."""
-        if not self.coordinator.data or not self.coordinator.data.get("events"):
-            return None
-
-        events = self.coordinator.data["events"]
-        if not events:
-            return None
-
-        # Get the first event (already sorted by date)
-        event_data = events[0]
-        start = event_data["start"]
-        if isinstance(start, date):
-            start = datetime.combine(start, datetime.min.time())
-            start = dt_util.as_local(start)
-
+        # CalendarEvent views of the current data, built on demand
+        self._indexed_data: dict[str, Any] | None = None
+        self._calendar_events: list[CalendarEvent] = []
+        # (archive, its version, fractions labelling it, archived events) and
+        # the views of the last queried range of it
+        self._past: tuple[AddressPointHistory, int, dict[str, Any], Schedule] | None = None
+        self._past_range: tuple[int, int, list[CalendarEvent]] | None = None
+
+    def _events(self) -> Schedule:
+        """Return the sorted schedule events, resetting the views on new data."""
+        data = self.coordinator.data
+        if data is not self._indexed_data:
+            self._indexed_data = data
+            self._calendar_events = []
+        return data["events"] if data else Schedule()
+
+    def _views(self, events: Schedule, end: int) -> list[CalendarEvent]:
+        """Return the CalendarEvent views of the events, built at least up to end.
+
+        Unchanged schedules keep the same data object, so each localized
+        CalendarEvent is built at most once per data version, and only once
+        a query reaches it.
+        """
+        views = self._calendar_events
+        if end <= len(views):
+            return views
+        views.extend(self._calendar_event(event) for event in events[len(views):end])
+        return views
+
+    def _calendar_event(self, event: ScheduleEvent) -> CalendarEvent:
+        """Return the localized CalendarEvent of a schedule event."""
+        start = dt_util.as_local(datetime.combine(event.start, datetime.min.time()))
         return CalendarEvent(
             start=start,
             end=start,
-            summary=event_data["summary"],
-            description=event_data.get("description", ""),
+            summary=event.summary,
+            description=event.description,
             location=None,
-            uid=f"{self.unique_id}_{event_data['fraction_id']}_{start.date().isoformat()}",
+            uid=f"{self.unique_id}_{event.fraction_id}_{event.start.isoformat()}",
         )
 
+    def _past_views(self, start: date, end: date) -> list[CalendarEvent]:
+        """Return the CalendarEvent views of the archived collections between two days.
+
+        The archive is labelled like the current schedule, rebuilt when either
+        changes. Only the views of the last range are kept, so repeated
+        queries of the same range are cheap and memory stays bounded.
+        """
+        coordinator = self.coordinator
+        history = async_get_history(coordinator.hass).get(coordinator.address_point_id)
+        # Ranges starting after the archive ends, like all ranges from today on
+        if history is None or not history.ordinals or history.ordinals[-1] < start.toordinal():
+            return []
+        fractions = coordinator.data["fractions"] if coordinator.data else {}
+        cached = self._past
+        if (
+            cached is None
+            or cached[0] is not history
+            or cached[1] != history.version
+            or cached[2] is not fractions
+        ):
+            cached = self._past = (
+                history,
+                history.version,
+                fractions,
+                history.schedule(fractions),
+            )
+            self._past_range = None
+        past = cached[3]
+        lo = past.bisect_left(start)
+        hi = past.bisect_right(end, lo)
+        if self._past_range is None or self._past_range[:2] != (lo, hi):
+            self._past_range = (
+                lo,
+                hi,
+                [self._calendar_event(event) for event in past[lo:hi]],
+            )
+        return self._past_range[2]
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the next upcoming event."""
+        events = self._events()
+        return self._views(events, 1)[0] if events else None
+
     async def async_get_events(
         self,
         hass: HomeAssistant,
         start_date: datetime,
         end_date: datetime,
     ) -> list[CalendarEvent]:
-        """Return calendar events within a datetime range."""
-        if not self.coordinator.data or not self.coordinator.data.get("events"):
-            return []
-
-        events = []
-        start_date_date = start_date.date()
-        end_date_date = end_date.date()
-
-        for event_data in self.coordinator.data["events"]:
-            event_start = event_data["start"]
-            if isinstance(event_start, date):
-                event_start_date = event_start
-            elif isinstance(event_start, datetime):
-                event_start_date = event_start.date()
-            else:
-                continue
-
-            # Check if event is within range
-            if start_date_date <= event_start_date <= end_date_date:
-                if isinstance(event_start, date):
-                    event_datetime = datetime.combine(event_start, datetime.min.time())
-                    event_datetime = dt_util.as_local(event_datetime)
-                else:
-                    event_datetime = dt_util.as_local(event_start)
-
-                events.append(
-                    CalendarEvent(
-                        start=event_datetime,
-                        end=event_datetime,
-                        summary=event_data["summary"],
-                        description=event_data.get("description", ""),
-                        location=None,
-                        uid=f"{self.unique_id}_{event_data['fraction_id']}_{event_start_date.isoformat()}",
-                    )
-                )
-
-        return events
-
+        """Return calendar events within a datetime range.
+
+        Days before the current schedule come from the archive of past
+        collections, which ends before it.
+        """
+        start = start_date.date()
+        end = end_date.date()
+        events = self._events()
+        lo = events.bisect_left(start)
+        hi = events.bisect_right(end, lo)
+        views = self._views(events, hi)[lo:hi]
+        if lo == 0 and (past := self._past_views(start, end)):
+            return past + views
+        return views
@@ -1,225 +1,135 @@
 """Config flow for Wywóz Odpadów integration."""
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Any
 
-import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
+from .address_index import AddressIndex, async_get_address_index
+from .api import PortalError, async_get_api_client
+from .autocomplete import async_get_autocomplete_cache
 from .const import (
-    API_AUTOCOMPLETE_PARAMS,
-    API_BASE_URL,
-    API_PARAMS,
+    AUTOCOMPLETE_RESULT_LIMIT,
+    CONF_ADAPTIVE_REFRESH,
     CONF_ADDRESS_POINT_ID,
     CONF_POSTAL_CODE,
+    CONF_SAFETY_MARGIN,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_SAFETY_MARGIN_DAYS,
     DEFAULT_UPDATE_INTERVAL_DAYS,
     DOMAIN,
 )
+from .hub import async_get_hub
 
 _LOGGER = logging.getLogger(__name__)
 
+# Portal errors reported as "cannot connect" rather than "invalid data"
+_CONNECTION_ERRORS = {
+    PortalError.UNAVAILABLE,
+    PortalError.TIMEOUT,
+    PortalError.CANNOT_CONNECT,
+    PortalError.HTTP_STATUS,
+}
+
 
 async def search_addresses(hass: HomeAssistant, postal_code: str) -> list[dict[str, Any]]:
     """Search for addresses using autocomplete API with postal code filter."""
-    params = API_AUTOCOMPLETE_PARAMS.copy()
-    
-    if postal_code:
-        params[
-            "_portalCKMjunkschedules_WAR_portalCKMjunkschedulesportlet_INSTANCE_o5AIb2mimbRJ_name"
-        ] = postal_code
-    
-    url = f"{API_BASE_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-    
+    client = async_get_api_client(hass)
+    url = client.autocomplete_url(postal_code)
+
     _LOGGER.debug("Searching addresses with postal_code: %s", postal_code)
+
+    cache = async_get_autocomplete_cache(hass)
+    if (cached := cache.get(postal_code)) is not None:
+        _LOGGER.debug("Found %s cached addresses", len(cached))
+        return cached
+
+    index = await async_get_address_index(hass)
+    if (local := index.lookup(postal_code)) is not None:
+        _LOGGER.debug("Found %s addresses in the local index", len(local))
+        # The index only answers queries whose whole result it holds
+        cache.put(postal_code, local, complete=True)
+        return local
+
     _LOGGER.debug("Request URL: %s", url)
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    _LOGGER.warning("Autocomplete API returned status: %s", response.status)
-                    return []
-                
-                # Parse JSON response (may have wrong Content-Type)
-                try:
-                    json_data = await response.json()
-                except aiohttp.ContentTypeError:
-                    response_text = await response.text()
-                    response_text_stripped = response_text.strip()
-                    if response_text_stripped.startswith(("[", "{")):
-                        import json
-                        json_data = json.loads(response_text)
-                    else:
-                        _LOGGER.warning("Autocomplete API returned non-JSON content")
-                        return []
-                
-                if not isinstance(json_data, list):
-                    _LOGGER.warning("Autocomplete API returned invalid format")
-                    return []
-                
-                _LOGGER.debug("Found %s addresses", len(json_data))
-                return json_data
-                
-        except Exception as err:
-            _LOGGER.error("Error searching addresses: %s", err)
-            return []
+
+    result = await client.async_fetch_json(url, timeout=10)
+    if not result.ok:
+        _LOGGER.warning("Error searching addresses: %s", result.detail)
+        return _search_index(index, postal_code)
+
+    json_data = result.data
+    _LOGGER.debug("Found %s addresses", len(json_data))
+    if not json_data:
+        return _search_index(index, postal_code)
+    cache.put(
+        postal_code, json_data, complete=len(json_data) < AUTOCOMPLETE_RESULT_LIMIT
+    )
+    index.async_add(postal_code, json_data)
+    return json_data
+
+
+def _search_index(index: AddressIndex, query: str) -> list[dict[str, Any]]:
+    """Fall back to a fuzzy search of the local index when the portal has no answer."""
+    results, score = index.search(query)
+    if results:
+        _LOGGER.debug(
+            "Portal had no results, found %s similar addresses in the local index (score: %.2f)",
+            len(results),
+            score,
+        )
+    return results
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
     address_point_id = data[CONF_ADDRESS_POINT_ID]
 
-    # Build API URL
-    params = API_PARAMS.copy()
-    params[
-        f"_portalCKMjunkschedules_WAR_portalCKMjunkschedulesportlet_INSTANCE_o5AIb2mimbRJ_addressPointId"
-    ] = str(address_point_id)
+    client = async_get_api_client(hass)
+    url = client.schedule_url(address_point_id)
 
-    url = f"{API_BASE_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-    
     _LOGGER.debug("Attempting to connect to API with address_point_id: %s", address_point_id)
     _LOGGER.debug("Request URL: %s", url)
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            _LOGGER.debug("Sending GET request to API")
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                _LOGGER.debug("Response status: %s", response.status)
-                _LOGGER.debug("Response headers: %s", dict(response.headers))
-                
-                if response.status != 200:
-                    response_text = await response.text()
-                    _LOGGER.error(
-                        "API returned non-200 status: %s. Response body: %s",
-                        response.status,
-                        response_text[:500]  # Limit log size
-                    )
-                    raise CannotConnect(f"API returned status {response.status}")
-                
-                # Try to parse JSON - API may return JSON with wrong Content-Type header
-                content_type = response.headers.get("Content-Type", "").lower()
-                _LOGGER.debug("Response Content-Type: %s", content_type)
-                
-                _LOGGER.debug("Parsing JSON response")
-                try:
-                    # Try to parse as JSON first (even if Content-Type is wrong)
-                    json_data = await response.json()
-                except aiohttp.ContentTypeError as err:
-                    # API returned wrong Content-Type, but might still be JSON
-                    # Read the response text to check
-                    response_text = await response.text()
-                    _LOGGER.debug(
-                        "ContentTypeError, but checking if response is actually JSON. Content-Type: %s. Response preview: %s",
-                        content_type,
-                        response_text[:200]
-                    )
-                    
-                    # Check if response looks like JSON (starts with [ or {)
-                    response_text_stripped = response_text.strip()
-                    if response_text_stripped.startswith(("[", "{")):
-                        # Looks like JSON, try to parse it manually
-                        import json
-                        try:
-                            json_data = json.loads(response_text)
-                            _LOGGER.info("Successfully parsed JSON despite wrong Content-Type header")
-                        except json.JSONDecodeError as json_err:
-                            _LOGGER.error(
-                                "Response looks like JSON but failed to parse: %s. Response body: %s",
-                                json_err,
-                                response_text[:1000]
-                            )
-                            raise InvalidData(
-                                f"API returned invalid JSON response. This may indicate an invalid address_point_id."
-                            ) from json_err
-                    else:
-                        # Looks like HTML or other non-JSON content
-                        _LOGGER.error(
-                            "API returned non-JSON content (Content-Type: %s). Response body: %s",
-                            content_type,
-                            response_text[:1000]  # Limit log size
-                        )
-                        raise InvalidData(
-                            f"API returned HTML instead of JSON. This may indicate an invalid address_point_id or API endpoint issue."
-                        ) from err
-                except Exception as parse_err:
-                    # Other parsing errors
-                    response_text = await response.text()
-                    _LOGGER.error(
-                        "Failed to parse JSON response. Error: %s. Content-Type: %s. Response body: %s",
-                        parse_err,
-                        content_type,
-                        response_text[:1000]
-                    )
-                    raise InvalidData(
-                        f"API returned invalid JSON response. This may indicate an invalid address_point_id."
-                    ) from parse_err
-                
-                _LOGGER.debug("Received JSON data: %s", str(json_data)[:200])  # Limit log size
-                
-                if not json_data or not isinstance(json_data, list):
-                    _LOGGER.error("Invalid response format. Expected list, got: %s", type(json_data))
-                    raise InvalidData("Invalid response format from API")
-                
-                if not json_data:
-                    _LOGGER.error("Empty response from API")
-                    raise InvalidData("No schedule data found for this address")
-                
-                # Check if harmonogramy exists and is not empty
-                harmonogramy = json_data[0].get("harmonogramy", [])
-                if not harmonogramy or (isinstance(harmonogramy, list) and len(harmonogramy) == 0):
-                    address_name = json_data[0].get("adres", "unknown address")
-                    _LOGGER.warning(
-                        "Empty harmonogramy found for address: %s. Available keys: %s",
-                        address_name,
-                        list(json_data[0].keys()) if json_data[0] else "empty"
-                    )
-                    raise InvalidData("no_schedule_found")
-                
-                # Get address name from response
-                address_name = json_data[0].get("adres", f"Address {address_point_id}")
-                
-                _LOGGER.info("Successfully validated connection for address_point_id: %s, address: %s", address_point_id, address_name)
-                
-                # Return the result here, inside the try block where json_data is available
-                return {"title": address_name, "address": address_name}
-                
-        except asyncio.TimeoutError as err:
-            _LOGGER.error("Timeout connecting to API: %s", err)
-            raise CannotConnect(f"Timeout connecting to API: {err}") from err
-        except aiohttp.ServerTimeoutError as err:
-            _LOGGER.error("Server timeout error: %s", err)
-            raise CannotConnect(f"Server timeout: {err}") from err
-        except aiohttp.ContentTypeError as err:
-            response_text = ""
-            if hasattr(err, 'request_info') and err.request_info:
-                _LOGGER.error("ContentTypeError: API returned non-JSON content. URL: %s", err.request_info.url)
-            _LOGGER.error("ContentTypeError details: %s", err)
-            raise InvalidData(
-                f"API returned HTML instead of JSON. This may indicate an invalid address_point_id or API endpoint issue."
-            ) from err
-        except InvalidData:
-            # Re-raise InvalidData exceptions (like empty harmonogramy) without modification
-            raise
-        except aiohttp.ClientConnectorError as err:
-            _LOGGER.error("Connection error to API: %s", err)
-            raise CannotConnect(f"Connection error: {err}") from err
-        except aiohttp.ClientResponseError as err:
-            _LOGGER.error("Client response error: %s (status: %s)", err, err.status)
-            raise CannotConnect(f"API response error: {err}") from err
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Client error connecting to API: %s (type: %s)", err, type(err).__name__)
-            raise CannotConnect(f"Error connecting to API: {err}") from err
-        except Exception as err:
-            _LOGGER.exception("Unexpected error during validation: %s", err)
-            raise CannotConnect(f"Unexpected error: {err}") from err
+    result = await client.async_fetch_json(url, timeout=10)
+    if result.error in _CONNECTION_ERRORS:
+        raise CannotConnect(result.detail)
+    if not result.ok:
+        raise InvalidData(result.detail)
+
+    json_data = result.data
+    _LOGGER.debug("Received JSON data: %s", str(json_data)[:200])  # Limit log size
+
+    if not json_data:
+        _LOGGER.error("Empty response from API")
+        raise InvalidData("No schedule data found for this address")
+
+    # Check if harmonogramy exists and is not empty
+    harmonogramy = json_data[0].get("harmonogramy", [])
+    if not harmonogramy:
+        address_name = json_data[0].get("adres", "unknown address")
+        _LOGGER.warning(
+            "Empty harmonogramy found for address: %s. Available keys: %s",
+            address_name,
+            list(json_data[0].keys()) if json_data[0] else "empty"
+        )
+        raise NoScheduleFound(f"No schedule found for {address_name}")
+
+    # Get address name from response
+    address_name = json_data[0].get("adres", f"Address {address_point_id}")
+
+    _LOGGER.info("Successfully validated connection for address_point_id: %s, address: %s", address_point_id, address_name)
+
+    # Seed the schedule cache so the new entry sets up without another fetch
+    await async_get_hub(hass).async_store_payload(address_point_id, json_data)
+
+    return {"title": address_name, "address": address_name}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -312,17 +222,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 except CannotConnect as err:
                     _LOGGER.error("CannotConnect error during config flow: %s", err)
                     errors["base"] = "cannot_connect"
+                except NoScheduleFound as err:
+                    _LOGGER.error("No schedule found during config flow: %s", err)
+                    errors["base"] = "no_schedule_found"
                 except InvalidData as err:
                     _LOGGER.error("InvalidData error during config flow: %s", err)
-                    # Check if it's a specific error message
-                    # Try both str(err) and err.args[0] to handle different error representations
-                    error_message = str(err)
-                    if hasattr(err, 'args') and err.args:
-                        error_message = err.args[0]
-                    if error_message == "no_schedule_found":
-                        errors["base"] = "no_schedule_found"
-                    else:
-                        errors["base"] = "invalid_data"
+                    errors["base"] = "invalid_data"
                 except Exception as err:
                     _LOGGER.exception("Unexpected exception during config flow: %s", err)
                     errors["base"] = "unknown"
@@ -334,6 +239,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             DOMAIN: {
                                 CONF_ADDRESS_POINT_ID: int(selected_address_id),
                                 CONF_UPDATE_INTERVAL: update_interval_seconds,
+                                CONF_ADAPTIVE_REFRESH: user_input.get(
+                                    CONF_ADAPTIVE_REFRESH, False
+                                ),
+                                CONF_SAFETY_MARGIN: user_input.get(
+                                    CONF_SAFETY_MARGIN, DEFAULT_SAFETY_MARGIN_DAYS
+                                ),
                             }
                         },
                     )
@@ -344,6 +255,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Optional(
                 CONF_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL_DAYS
             ): vol.All(vol.Coerce(int), vol.Range(min=1, max=7)),
+            vol.Optional(CONF_ADAPTIVE_REFRESH, default=False): bool,
+            vol.Optional(
+                CONF_SAFETY_MARGIN, default=DEFAULT_SAFETY_MARGIN_DAYS
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=30)),
         }
 
         return self.async_show_form(
@@ -353,6 +268,57 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={"postal_code": self.postal_code},
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow."""
+        return OptionsFlowHandler()
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for an address point validated by the import service."""
+        address_point_id = import_data[DOMAIN][CONF_ADDRESS_POINT_ID]
+        for entry in self._async_current_entries():
+            if entry.data.get(DOMAIN, {}).get(CONF_ADDRESS_POINT_ID) == address_point_id:
+                return self.async_abort(reason="already_configured")
+        return self.async_create_entry(
+            title=import_data["title"], data={DOMAIN: import_data[DOMAIN]}
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Edit the adaptive refresh settings of an entry.
+
+    Options override the values stored in the entry data when it was created;
+    the entry is reloaded when they change.
+    """
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        entry = self.hass.config_entries.async_get_entry(self.handler)
+        assert entry is not None
+        settings = {**entry.data.get(DOMAIN, {}), **entry.options}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ADAPTIVE_REFRESH,
+                        default=settings.get(CONF_ADAPTIVE_REFRESH, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_SAFETY_MARGIN,
+                        default=settings.get(CONF_SAFETY_MARGIN, DEFAULT_SAFETY_MARGIN_DAYS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=30)),
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -360,3 +326,7 @@ class CannotConnect(HomeAssistantError):
 class InvalidData(HomeAssistantError):
     """Error to indicate invalid data."""
 
+
+class NoScheduleFound(InvalidData):
+    """Error to indicate the address has no collection schedule."""
+
@@ -23,15 +23,113 @@ API_AUTOCOMPLETE_PARAMS = {
     "p_p_cacheability": "cacheLevelPage",
 }
 
+# Shared HTTP client (connection pool limits, keep-alive in seconds)
+DEFAULT_CONNECTION_LIMIT = 20
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 4
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+
+# Keys for integration-wide objects stored in hass.data
+DATA_API_CLIENT = f"{DOMAIN}_api_client"
+DATA_HUB = f"{DOMAIN}_hub"
+DATA_AUTOCOMPLETE_CACHE = f"{DOMAIN}_autocomplete_cache"
+DATA_ADDRESS_INDEX = f"{DOMAIN}_address_index"
+DATA_FRACTION_TRANSLATIONS = f"{DOMAIN}_fraction_translations"
+DATA_HISTORY = f"{DOMAIN}_history"
+
+# Language of the fraction names returned by the portal
+PORTAL_LANGUAGE = "pl"
+
+# Address autocomplete cache (time to live in seconds, number of queries kept)
+AUTOCOMPLETE_CACHE_TTL = 3600
+AUTOCOMPLETE_CACHE_MAX_ENTRIES = 64
+
+# The portal does not document a limit on address search results; answers with
+# this many addresses are treated as possibly truncated, so they are not
+# filtered to answer narrower queries
+AUTOCOMPLETE_RESULT_LIMIT = 100
+
+# Portal request resilience: attempts per request and exponential backoff with
+# jitter (seconds), lower bound of the latency-based timeout (seconds), and the
+# circuit breaker (consecutive failures to open, initial and maximum pause)
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 10.0
+ADAPTIVE_TIMEOUT_MIN = 10.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+CIRCUIT_RESET_TIMEOUT_MAX = 900.0
+
+# Maximum number of address points fetched from the portal at the same time
+DEFAULT_MAX_CONCURRENT_FETCHES = 4
+
+# Refresh scheduler: slot length of the time wheel, and the delay after startup
+# and window over which overdue refreshes are spread (all in seconds)
+SCHEDULER_SLOT_SECONDS = 300
+SCHEDULER_STARTUP_DELAY = 120
+SCHEDULER_STARTUP_WINDOW = 3600
+
+# On-disk cache of the last good raw schedule per address point
+CACHE_STORAGE_KEY = f"{DOMAIN}.schedules"
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 10
+
+# On-disk archive of past collections per address point: how long and how many
+# collections are kept per address point
+HISTORY_STORAGE_KEY = f"{DOMAIN}.history"
+HISTORY_STORAGE_VERSION = 1
+HISTORY_SAVE_DELAY = 60
+HISTORY_RETENTION_DAYS = 730
+HISTORY_MAX_EVENTS = 2000
+
+# On-disk index of address points seen in autocomplete responses (the number of
+# answered queries remembered for coverage checks is bounded)
+ADDRESS_INDEX_STORAGE_KEY = f"{DOMAIN}.addresses"
+ADDRESS_INDEX_STORAGE_VERSION = 1
+ADDRESS_INDEX_SAVE_DELAY = 30
+ADDRESS_INDEX_MAX_QUERIES = 500
+
+# Refresh telemetry shown in diagnostics: latency and processing samples kept
+# per address point
+TELEMETRY_SAMPLES = 100
+
+# Coordinator listener context of entities showing the whole schedule; fraction
+# sensors use their (upper case) id_frakcja
+SCHEDULE_CONTEXT = "schedule"
+
+# Profiling service: default and maximum length of a profiling window (seconds)
+SERVICE_PROFILE = "profile"
+PROFILE_DEFAULT_DURATION = 60
+PROFILE_MAX_DURATION = 3600
+
+# Bulk import service: address points per call, validations running at once
+# (matching the per-host connection limit) and entries set up per batch
+SERVICE_IMPORT_ADDRESSES = "import_addresses"
+IMPORT_MAX_ADDRESS_POINTS = 1000
+IMPORT_MAX_CONCURRENT_VALIDATIONS = DEFAULT_CONNECTION_LIMIT_PER_HOST
+IMPORT_BATCH_SIZE = 20
+
+# iCalendar feed service: returns an entry's feed URL, optionally with a new token
+SERVICE_CALENDAR_FEED_URL = "calendar_feed_url"
+
 # Default update interval (1 day in days for UI, kept in seconds for internal use)
 DEFAULT_UPDATE_INTERVAL_DAYS = 1
 # Keep old constant for backward compatibility (24 hours in seconds)
 DEFAULT_UPDATE_INTERVAL = 86400
 
+# Adaptive refresh: refresh a safety margin (days) before the known schedule runs
+# out, back off while it is stable, never wait longer than the maximum interval and
+# use the configured interval within the window (days) around the turn of the year
+DEFAULT_SAFETY_MARGIN_DAYS = 7
+MAX_ADAPTIVE_UPDATE_INTERVAL_DAYS = 28
+YEAR_BOUNDARY_WINDOW_DAYS = 14
+
 # Configuration keys
 CONF_ADDRESS_POINT_ID = "address_point_id"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_POSTAL_CODE = "postal_code"
+CONF_ADAPTIVE_REFRESH = "adaptive_refresh"
+CONF_SAFETY_MARGIN = "safety_margin"
+CONF_FEED_TOKEN = "feed_token"
 
 # Fraction type mappings for TrashCard (key = id_frakcja from API)
 FRACTION_TYPE_MAPPING = {
@@ -1,28 +1,90 @@
 """Data update coordinator for Wywóz Odpadów."""
 from __future__ import annotations
 
-import asyncio
+from dataclasses import replace
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from time import monotonic
 from typing import Any
 
-import aiohttp
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import translation
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
+from .api import PortalError, async_get_api_client
 from .const import (
-    API_BASE_URL,
-    API_PARAMS,
+    CONF_ADAPTIVE_REFRESH,
+    CONF_ADDRESS_POINT_ID,
+    CONF_SAFETY_MARGIN,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_SAFETY_MARGIN_DAYS,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
     FRACTION_TYPE_MAPPING,
+    MAX_ADAPTIVE_UPDATE_INTERVAL_DAYS,
+    SCHEDULE_CONTEXT,
+    YEAR_BOUNDARY_WINDOW_DAYS,
 )
+from .history import async_get_history
+from .hub import async_get_hub
+from .localization import async_get_fraction_translations
+from .models import FractionLabel, FractionState, Schedule, fraction_label
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _parse_event_date(value: str) -> date | None:
+    """Parse a YYYY-MM-DD date, memoized since dates repeat across fractions and entries."""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _with_next_dates(
+    fractions: dict[str, FractionState], next_dates: dict[str, date], day: date
+) -> dict[str, FractionState]:
+    """Return the fractions with their next collection as seen on the day."""
+    updated = {}
+    for fraction_id, fraction in fractions.items():
+        next_date = next_dates.get(fraction_id)
+        updated[fraction_id] = replace(
+            fraction,
+            next_date=next_date,
+            days_until=(next_date - day).days if next_date is not None else None,
+        )
+    return updated
+
+
+def _changed_contexts(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    """Return the listener contexts whose part of the data differs."""
+    old_fractions = old["fractions"]
+    new_fractions = new["fractions"]
+    changed = {
+        fraction_id
+        for fraction_id in old_fractions.keys() | new_fractions.keys()
+        if old_fractions.get(fraction_id) != new_fractions.get(fraction_id)
+    }
+    if old["events"] != new["events"]:
+        changed.add(SCHEDULE_CONTEXT)
+    return changed
+
+
+def _is_near_year_boundary(day: date) -> bool:
+    """Return True if the day is within the window around January 1st."""
+    days_since_new_year = (day - date(day.year, 1, 1)).days
+    days_to_new_year = (date(day.year + 1, 1, 1) - day).days
+    return min(days_since_new_year, days_to_new_year) <= YEAR_BOUNDARY_WINDOW_DAYS
+
+
 class WywozOdpadowDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
@@ -31,147 +93,246 @@ class WywozOdpadowDataUpdateCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         address_point_id: int,
         update_interval: int = DEFAULT_UPDATE_INTERVAL,
+        adaptive_refresh: bool = False,
+        safety_margin: int = DEFAULT_SAFETY_MARGIN_DAYS,
     ) -> None:
         """Initialize."""
         self.address_point_id = address_point_id
-        # Store update interval in seconds for reference, but don't set it as attribute
-        # because DataUpdateCoordinator expects update_interval to be a timedelta
-        self._update_interval_seconds = update_interval
+        # Configured interval; adaptive refresh only ever lengthens it
+        self._base_update_interval = timedelta(seconds=update_interval)
+        self._refresh_interval = self._base_update_interval
+        self._adaptive_refresh = adaptive_refresh
+        self._safety_margin = safety_margin
         self._fraction_translations: dict[str, str] = {}
+        # Change detection: hash of the last processed payload and the day it was processed
+        self._payload_hash: str | None = None
+        self._processed_on: date | None = None
+        self._refreshes_processed = 0
+        self._refreshes_skipped = 0
+        # What the listeners were last notified about, to notify only changes
+        self._notified_data: dict[str, Any] | None = None
+        self._notified_success = True
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            # Refreshes are scheduled by the hub (see refresh_interval)
+            update_interval=None,
+            # Unchanged schedules return the same data object; don't notify listeners
+            always_update=False,
+        )
+
+    @classmethod
+    def from_config_entry(
+        cls, hass: HomeAssistant, entry: ConfigEntry
+    ) -> WywozOdpadowDataUpdateCoordinator:
+        """Create the coordinator of a config entry.
+
+        Adaptive refresh settings are read from the entry options, falling
+        back to the values stored in the entry data when it was created.
+        """
+        settings = {**entry.data[DOMAIN], **entry.options}
+        return cls(
+            hass,
+            settings[CONF_ADDRESS_POINT_ID],
+            settings.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            settings.get(CONF_ADAPTIVE_REFRESH, False),
+            settings.get(CONF_SAFETY_MARGIN, DEFAULT_SAFETY_MARGIN_DAYS),
         )
 
+    @property
+    def refresh_interval(self) -> timedelta:
+        """Return the interval between refreshes scheduled by the hub."""
+        return self._refresh_interval
+
+    @property
+    def refresh_counters(self) -> dict[str, int]:
+        """Return how many refreshes were processed and how many were skipped as unchanged."""
+        return {
+            "processed": self._refreshes_processed,
+            "skipped": self._refreshes_skipped,
+        }
+
     async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data through the hub, shared with entries for the same address point."""
+        data = await async_get_hub(self.hass).async_fetch(self)
+        self._adapt_update_interval(data)
+        return data
+
+    @callback
+    def async_set_updated_data(self, data: dict[str, Any]) -> None:
+        """Set data pushed by the hub or restored from cache."""
+        self._adapt_update_interval(data)
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose part of the data changed.
+
+        Entities subscribe with their fraction id or SCHEDULE_CONTEXT as
+        context; listeners without a context hear about every change. All
+        listeners are notified on the first data and when availability
+        changes.
+        """
+        previous, self._notified_data = self._notified_data, self.data
+        success_changed = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+        if previous is None or self.data is None or success_changed:
+            super().async_update_listeners()
+            return
+        if previous is self.data or not (changed := _changed_contexts(previous, self.data)):
+            return
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed:
+                update_callback()
+
+    @callback
+    def _adapt_update_interval(self, data: dict[str, Any]) -> None:
+        """Derive the next refresh interval from the known schedule horizon."""
+        if not self._adaptive_refresh or not data:
+            return
+
+        today = dt_util.now().date()
+        events = data.get("events") or []
+        # Refresh at the latest a safety margin before the known schedule runs out
+        horizon_days = (events[-1].start - today).days if events else 0
+        interval_days = horizon_days - self._safety_margin
+
+        # Back off while the schedule is stable: wait at most half as long as it
+        # has been unchanged, so a freshly changed schedule is checked again soon
+        changed_at = async_get_hub(self.hass).schedule_changed_at(self.address_point_id)
+        stable_days = (dt_util.utcnow() - changed_at).days if changed_at else 0
+        interval_days = min(interval_days, stable_days // 2)
+
+        # New yearly schedules are published around the turn of the year
+        if _is_near_year_boundary(today):
+            interval_days = 0
+
+        interval = max(
+            timedelta(days=min(interval_days, MAX_ADAPTIVE_UPDATE_INTERVAL_DAYS)),
+            self._base_update_interval,
+        )
+        if interval != self._refresh_interval:
+            _LOGGER.debug(
+                "Adaptive refresh for address_point_id %s: next refresh in %s "
+                "(horizon: %s days, stable for: %s days)",
+                self.address_point_id,
+                interval,
+                horizon_days,
+                stable_days,
+            )
+            self._refresh_interval = interval
+            async_get_hub(self.hass).async_schedule_refresh(self.address_point_id)
+
+    async def async_fetch_schedule(self) -> dict[str, Any]:
         """Fetch data from API."""
-        # Load translations if not already loaded
-        if not self._fraction_translations:
-            await self._load_fraction_translations()
-        
-        # Build API URL
-        params = API_PARAMS.copy()
-        params[
-            f"_portalCKMjunkschedules_WAR_portalCKMjunkschedulesportlet_INSTANCE_o5AIb2mimbRJ_addressPointId"
-        ] = str(self.address_point_id)
-
-        url = f"{API_BASE_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-        
+        # Translations of the current language (cached integration-wide)
+        await self._load_fraction_translations()
+
+        client = async_get_api_client(self.hass)
+        url = client.schedule_url(self.address_point_id)
+
         _LOGGER.debug("Fetching data for address_point_id: %s", self.address_point_id)
         _LOGGER.debug("Request URL: %s", url)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                _LOGGER.debug("Sending GET request to API")
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    _LOGGER.debug("Response status: %s", response.status)
-                    
-                    if response.status != 200:
-                        response_text = await response.text()
-                        _LOGGER.error(
-                            "API returned non-200 status: %s. Response body: %s",
-                            response.status,
-                            response_text[:500]  # Limit log size
-                        )
-                        raise UpdateFailed(f"API returned status {response.status}")
-
-                    # Try to parse JSON - API may return JSON with wrong Content-Type header
-                    content_type = response.headers.get("Content-Type", "").lower()
-                    _LOGGER.debug("Response Content-Type: %s", content_type)
-                    
-                    _LOGGER.debug("Parsing JSON response")
-                    try:
-                        # Try to parse as JSON first (even if Content-Type is wrong)
-                        json_data = await response.json()
-                    except aiohttp.ContentTypeError as err:
-                        # API returned wrong Content-Type, but might still be JSON
-                        # Read the response text to check
-                        response_text = await response.text()
-                        _LOGGER.debug(
-                            "ContentTypeError, but checking if response is actually JSON. Content-Type: %s. Response preview: %s",
-                            content_type,
-                            response_text[:200]
-                        )
-                        
-                        # Check if response looks like JSON (starts with [ or {)
-                        response_text_stripped = response_text.strip()
-                        if response_text_stripped.startswith(("[", "{")):
-                            # Looks like JSON, try to parse it manually
-                            import json
-                            try:
-                                json_data = json.loads(response_text)
-                                _LOGGER.info("Successfully parsed JSON despite wrong Content-Type header")
-                            except json.JSONDecodeError as json_err:
-                                _LOGGER.error(
-                                    "Response looks like JSON but failed to parse: %s. Response body: %s",
-                                    json_err,
-                                    response_text[:1000]
-                                )
-                                raise UpdateFailed(
-                                    f"API returned invalid JSON response. This may indicate an invalid address_point_id."
-                                ) from json_err
-                        else:
-                            # Looks like HTML or other non-JSON content
-                            _LOGGER.error(
-                                "API returned non-JSON content (Content-Type: %s). Response body: %s",
-                                content_type,
-                                response_text[:1000]  # Limit log size
-                            )
-                            raise UpdateFailed(
-                                f"API returned HTML instead of JSON. This may indicate an invalid address_point_id or API endpoint issue."
-                            ) from err
-                    except Exception as parse_err:
-                        # Other parsing errors
-                        response_text = await response.text()
-                        _LOGGER.error(
-                            "Failed to parse JSON response. Error: %s. Content-Type: %s. Response body: %s",
-                            parse_err,
-                            content_type,
-                            response_text[:1000]
-                        )
-                        raise UpdateFailed(
-                            f"API returned invalid JSON response. This may indicate an invalid address_point_id."
-                        ) from parse_err
-                    
-                    _LOGGER.debug("Received JSON data length: %s items", len(json_data) if isinstance(json_data, list) else "N/A")
-
-                    if not json_data or not isinstance(json_data, list):
-                        _LOGGER.error("Invalid response format. Expected list, got: %s", type(json_data))
-                        raise UpdateFailed("Invalid response format from API")
-
-                    # Process the data
-                    _LOGGER.debug("Processing data")
-                    processed_data = self._process_data(json_data)
-                    _LOGGER.debug("Processed %s events", len(processed_data.get("events", [])))
-                    return processed_data
-
-            except asyncio.TimeoutError as err:
-                _LOGGER.error("Timeout communicating with API: %s", err)
-                raise UpdateFailed(f"Timeout communicating with API: {err}") from err
-            except aiohttp.ServerTimeoutError as err:
-                _LOGGER.error("Server timeout error: %s", err)
-                raise UpdateFailed(f"Server timeout: {err}") from err
-            except aiohttp.ContentTypeError as err:
-                _LOGGER.error("ContentTypeError: API returned non-JSON content. URL: %s", url)
-                _LOGGER.error("ContentTypeError details: %s", err)
-                raise UpdateFailed(
-                    f"API returned HTML instead of JSON. This may indicate an invalid address_point_id or API endpoint issue."
-                ) from err
-            except aiohttp.ClientConnectorError as err:
-                _LOGGER.error("Connection error to API: %s", err)
-                raise UpdateFailed(f"Connection error: {err}") from err
-            except aiohttp.ClientResponseError as err:
-                _LOGGER.error("Client response error: %s (status: %s)", err, err.status)
-                raise UpdateFailed(f"API response error: {err}") from err
-            except aiohttp.ClientError as err:
-                _LOGGER.error("Client error communicating with API: %s (type: %s)", err, type(err).__name__)
-                raise UpdateFailed(f"Error communicating with API: {err}") from err
-            except Exception as err:
-                _LOGGER.exception("Unexpected error during data update: %s", err)
-                raise UpdateFailed(f"Unexpected error: {err}") from err
+        # Skip decoding and processing when the schedule did not change
+        today = dt_util.now().date()
+        unchanged_hash = (
+            self._payload_hash
+            if self.data is not None and today == self._processed_on
+            else None
+        )
+        telemetry = async_get_hub(self.hass).telemetry(self.address_point_id)
+        started = monotonic()
+        result = await client.async_fetch_json(url, timeout=30, unchanged_hash=unchanged_hash)
+        if result.response is not None:
+            telemetry.record_fetch(
+                monotonic() - started - result.decode_time, len(result.response.body)
+            )
+
+        if result.error is PortalError.UNAVAILABLE:
+            # Already logged once by the circuit breaker
+            _LOGGER.debug("Skipping request for address_point_id %s: %s", self.address_point_id, result.detail)
+            telemetry.record_failure(result.error)
+            raise UpdateFailed(result.detail)
+        if not result.ok:
+            telemetry.record_failure(result.error)
+            raise UpdateFailed(result.detail)
+
+        not_modified = result.response.not_modified if result.response else False
+        if result.unchanged:
+            self._refreshes_skipped += 1
+            telemetry.record_success(unchanged=True, not_modified=not_modified)
+            async_get_hub(self.hass).async_mark_fetched(self.address_point_id)
+            _LOGGER.debug(
+                "Schedule unchanged for address_point_id: %s (not modified: %s); "
+                "reusing processed data (processed: %s, skipped: %s)",
+                self.address_point_id,
+                not_modified,
+                self._refreshes_processed,
+                self._refreshes_skipped,
+            )
+            return self.data
+
+        json_data = result.data
+        _LOGGER.debug("Received JSON data length: %s items", len(json_data))
+        if not json_data:
+            _LOGGER.error("Empty response from API for address_point_id: %s", self.address_point_id)
+            telemetry.record_failure("empty_response")
+            raise UpdateFailed("Invalid response format from API")
+
+        # Remember the last good payload for network-free startup
+        await async_get_hub(self.hass).async_store_payload(
+            self.address_point_id, json_data
+        )
+
+        # Process the data
+        _LOGGER.debug("Processing data")
+        process_start = monotonic()
+        processed_data = self._process_data(json_data)
+        telemetry.record_processed(
+            result.decode_time,
+            monotonic() - process_start,
+            len(processed_data["events"]),
+            len(processed_data["fractions"]),
+        )
+        telemetry.record_success(not_modified=not_modified)
+        self._payload_hash = result.body_hash
+        self._processed_on = today
+        self._refreshes_processed += 1
+        _LOGGER.debug("Processed %s events", len(processed_data.get("events", [])))
+        _LOGGER.debug("HTTP connection stats: %s", client.stats)
+        return processed_data
+
+    def build_data_for_day(self, data: dict[str, Any], day: date) -> dict[str, Any]:
+        """Return data rolled over to the given day without refetching.
+
+        Events before the day are archived and dropped, and each fraction's
+        next_date and days_until are recomputed from the remaining (sorted)
+        events.
+        """
+        events: Schedule = data["events"]
+        cut = events.bisect_left(day)
+        async_get_history(self.hass).async_append(self.address_point_id, events[:cut], day)
+        events = events[cut:]
+        return {
+            **data,
+            "events": events,
+            "fractions": _with_next_dates(data["fractions"], events.next_dates(), day),
+        }
+
+    @callback
+    def async_set_day_data(self, data: dict[str, Any], day: date) -> None:
+        """Set data rolled over to a new day, keeping the refresh schedule."""
+        self.data = data
+        self._processed_on = day
+        self.async_update_listeners()
+
+    async def async_restore_cached(self, json_data: list[dict[str, Any]]) -> None:
+        """Set data from a cached raw payload without contacting the API."""
+        await self._load_fraction_translations()
+        self.async_set_updated_data(self._process_data(json_data))
 
     def _process_data(self, json_data: list[dict[str, Any]]) -> dict[str, Any]:
         """Process raw JSON data into structured format."""
@@ -179,7 +340,7 @@ class WywozOdpadowDataUpdateCoordinator(DataUpdateCoordinator):
             return {
                 "address": None,
                 "district": None,
-                "events": [],
+                "events": Schedule(),
                 "fractions": {},
             }
 
@@ -190,11 +351,19 @@ class WywozOdpadowDataUpdateCoordinator(DataUpdateCoordinator):
         district = data.get("dzielnicy", "")
         harmonogramy = data.get("harmonogramy", [])
 
-        # Process events for calendar
-        events = []
-        fractions = {}  # fraction_id -> fraction data
+        # Collect the events as columns and track fractions in a single pass
+        ordinals: list[int] = []
+        codes: list[int] = []
+        # Past events, archived for past-range calendar queries
+        past_ordinals: list[int] = []
+        past_codes: list[int] = []
+        labels: list[FractionLabel] = []
+        # (fraction_id, API name) -> index of its interned label
+        label_codes: dict[tuple[str, str], int] = {}
+        fractions: dict[str, FractionState] = {}
 
         now = dt_util.now().date()
+        today = now.toordinal()
 
         for item in harmonogramy:
             event_date_str = item.get("data", "")
@@ -205,83 +374,53 @@ class WywozOdpadowDataUpdateCoordinator(DataUpdateCoordinator):
             if not event_date_str or not fraction_id:
                 continue
 
-            try:
-                event_date = datetime.strptime(event_date_str, "%Y-%m-%d").date()
-            except ValueError:
+            event_date = _parse_event_date(event_date_str)
+            if event_date is None:
                 _LOGGER.warning(f"Invalid date format: {event_date_str}")
                 continue
 
             # Translate fraction by id_frakcja
-            translated_name = self._translate_fraction(fraction_id, fraction_name)
-            
-            # Only include future events or today
-            if event_date >= now:
-                events.append(
-                    {
-                        "start": event_date,
-                        "end": event_date,
-                        "summary": translated_name,
-                        "description": f"Wywóz: {translated_name}",
-                        "fraction_id": fraction_id,
-                        "fraction_name": translated_name,
-                    }
+            code = label_codes.get((fraction_id, fraction_name))
+            if code is None:
+                code = label_codes[(fraction_id, fraction_name)] = len(labels)
+                labels.append(
+                    fraction_label(
+                        fraction_id, self._translate_fraction(fraction_id, fraction_name)
+                    )
                 )
 
+            # Only include future events or today
+            if (ordinal := event_date.toordinal()) >= today:
+                ordinals.append(ordinal)
+                codes.append(code)
+            else:
+                past_ordinals.append(ordinal)
+                past_codes.append(code)
+
             # Track fractions for sensor attributes
             if fraction_id not in fractions:
-                fractions[fraction_id] = {
-                    "id": fraction_id,
-                    "name": translated_name,
-                    "type": FRACTION_TYPE_MAPPING.get(fraction_id, "custom"),
-                    "next_date": None,
-                    "days_until": None,
-                }
-
-        # Sort events by date
-        events.sort(key=lambda x: x["start"])
-
-        # Calculate next date and days until for each fraction
-        for fraction_id, fraction_data in fractions.items():
-            fraction_events = [
-                e for e in events if e["fraction_id"] == fraction_id and e["start"] >= now
-            ]
-            if fraction_events:
-                next_event = fraction_events[0]
-                next_date = next_event["start"]
-                days_until = (next_date - now).days
-
-                fraction_data["next_date"] = next_date.isoformat()
-                fraction_data["days_until"] = days_until
+                fractions[fraction_id] = FractionState(
+                    labels[code], FRACTION_TYPE_MAPPING.get(fraction_id, "custom")
+                )
+
+        # Sorted by date (a linear check for the already ordered portal payload)
+        events = Schedule(ordinals, codes, tuple(labels))
+        if past_ordinals:
+            past = Schedule(past_ordinals, past_codes, events.columns()[2])
+            async_get_history(self.hass).async_append(self.address_point_id, past, now)
 
         return {
             "address": address,
             "district": district,
             "events": events,
-            "fractions": fractions,
+            "fractions": _with_next_dates(fractions, events.next_dates(), now),
         }
 
     async def _load_fraction_translations(self) -> None:
-        """Load fraction translations from Home Assistant translations."""
-        self._fraction_translations = {}
-        try:
-            translations = await translation.async_get_translations(
-                self.hass, self.hass.config.language, "common", [DOMAIN]
-            )
-            if not translations or DOMAIN not in translations:
-                return
-            domain_translations = translations[DOMAIN]
-            # Nested: domain["common"]["fraction_OP"]
-            if "common" in domain_translations and isinstance(domain_translations["common"], dict):
-                for k, v in domain_translations["common"].items():
-                    if k.startswith("fraction_") and isinstance(v, str):
-                        self._fraction_translations[k[9:]] = v
-            # Flat: domain["common.fraction_OP"] (some HA versions)
-            for k, v in domain_translations.items():
-                if isinstance(k, str) and k.startswith("common.fraction_") and isinstance(v, str):
-                    fraction_id = k.replace("common.fraction_", "", 1)
-                    self._fraction_translations.setdefault(fraction_id, v)
-        except Exception:
-            pass
+        """Use the shared fraction translations of the current language."""
+        self._fraction_translations = await async_get_fraction_translations(
+            self.hass
+        ).async_get(self.hass.config.language)
 
     def _translate_fraction(self, fraction_id: str, fraction_name: str) -> str:
         """Translate fraction by id_frakcja using loaded translations; fallback to API name."""
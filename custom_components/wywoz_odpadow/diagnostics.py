@@ -0,0 +1,104 @@
+"""Diagnostics support for Wywóz Odpadów."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .api import async_get_api_client
+from .autocomplete import async_get_autocomplete_cache
+from .const import DOMAIN
+from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .history import async_get_history
+from .hub import WywozOdpadowHub, async_get_hub
+
+# Addresses identify the user's home
+TO_REDACT = {"address", "title"}
+
+# Address points listed in the integration-wide ranking
+MAX_RANKED_ADDRESS_POINTS = 20
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry and the integration as a whole."""
+    coordinator: WywozOdpadowDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    hub = async_get_hub(hass)
+    address_point_id = coordinator.address_point_id
+    data = coordinator.data or {}
+    cached = hub.cached_payload(address_point_id)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "address_point_id": address_point_id,
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": (
+                repr(coordinator.last_exception) if coordinator.last_exception else None
+            ),
+            "refresh_interval_seconds": coordinator.refresh_interval.total_seconds(),
+            "next_refresh": hub.next_refresh(address_point_id),
+            "refresh_counters": coordinator.refresh_counters,
+            "cached_payload_fetched_at": cached[1] if cached else None,
+            "schedule_changed_at": hub.schedule_changed_at(address_point_id),
+        },
+        "data": async_redact_data(
+            {
+                "address": data.get("address"),
+                "district": data.get("district"),
+                "events": len(data.get("events") or ()),
+                "fractions": {
+                    fraction_id: {
+                        "name": fraction.name,
+                        "type": fraction.type,
+                        "next_date": (
+                            fraction.next_date.isoformat() if fraction.next_date else None
+                        ),
+                        "days_until": fraction.days_until,
+                    }
+                    for fraction_id, fraction in (data.get("fractions") or {}).items()
+                },
+            },
+            TO_REDACT,
+        ),
+        "telemetry": hub.telemetry(address_point_id).as_dict(),
+        "integration": _integration_diagnostics(hass, hub),
+    }
+
+
+@callback
+def _integration_diagnostics(hass: HomeAssistant, hub: WywozOdpadowHub) -> dict[str, Any]:
+    """Return integration-wide diagnostics.
+
+    Address points are ranked by failures and then by p95 fetch latency, so
+    slow or failing ones stand out without enabling debug logging.
+    """
+    address_points = []
+    for address_point_id in hub.address_point_ids:
+        telemetry = hub.telemetry(address_point_id)
+        stats = telemetry.as_dict()
+        address_points.append(
+            {
+                "address_point_id": address_point_id,
+                "failures": telemetry.failure_count,
+                "last_failure": telemetry.last_failure,
+                "successes": telemetry.successes,
+                "p95_latency_ms": stats["fetch_latency_ms"]["p95"],
+                "seconds_since_last_success": stats["seconds_since_last_success"],
+            }
+        )
+    address_points.sort(
+        key=lambda item: (-item["failures"], -(item["p95_latency_ms"] or 0))
+    )
+
+    return {
+        "entries": len(hass.data.get(DOMAIN, {})),
+        "hub": hub.stats,
+        "api_client": async_get_api_client(hass).stats,
+        "autocomplete_cache": async_get_autocomplete_cache(hass).stats,
+        "history": async_get_history(hass).stats,
+        "address_points": address_points[:MAX_RANKED_ADDRESS_POINTS],
+    }
@@ -0,0 +1,38 @@
+"""Base entity for Wywóz Odpadów."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import WywozOdpadowDataUpdateCoordinator
+
+
+class WywozOdpadowEntity(CoordinatorEntity[WywozOdpadowDataUpdateCoordinator]):
+    """Entity of a config entry's device, updated only when its context changed.
+
+    The context is the part of the coordinator data the entity shows (see
+    WywozOdpadowDataUpdateCoordinator.async_update_listeners).
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: WywozOdpadowDataUpdateCoordinator,
+        entry: ConfigEntry,
+        context: Any = None,
+    ) -> None:
+        """Initialize the entity and its device information."""
+        super().__init__(coordinator, context)
+        self._entry = entry
+        # Read once when the entity is added, so built once from the data
+        # loaded before the platforms are set up
+        address = (coordinator.data or {}).get("address") or entry.title
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": address or f"Wywóz Odpadów ({coordinator.address_point_id})",
+            "manufacturer": "Warszawa 19115",
+        }
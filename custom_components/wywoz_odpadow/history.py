@@ -0,0 +1,219 @@
+"""Append-only archive of past collections per address point."""
+from __future__ import annotations
+
+from array import array
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_HISTORY,
+    HISTORY_MAX_EVENTS,
+    HISTORY_RETENTION_DAYS,
+    HISTORY_SAVE_DELAY,
+    HISTORY_STORAGE_KEY,
+    HISTORY_STORAGE_VERSION,
+)
+from .models import FractionState, Schedule, fraction_label
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AddressPointHistory:
+    """Past collections of one address point, as date ordinal and label code columns.
+
+    Only days after the last archived one are appended, so processing the
+    same payload again, or for several entries, adds nothing. Labels are
+    (id_frakcja, name) pairs; the name is only used for fractions that are no
+    longer in the current schedule, the others are shown with their current
+    (translated) label.
+    """
+
+    __slots__ = ("ordinals", "codes", "labels", "_label_codes", "version")
+
+    def __init__(
+        self,
+        ordinals: list[int] | None = None,
+        codes: list[int] | None = None,
+        labels: list[tuple[str, str]] | None = None,
+    ) -> None:
+        """Initialize from stored columns."""
+        self.ordinals = array("i", ordinals or ())
+        self.codes = array("H", codes or ())
+        self.labels: list[tuple[str, str]] = labels or []
+        self._label_codes = {label: code for code, label in enumerate(self.labels)}
+        # Bumped on every change, so readers can cache what they build from it
+        self.version = 0
+
+    def append(self, past: Schedule) -> int:
+        """Append the events on days after the last archived one; return how many."""
+        ordinals, codes, labels = past.columns()
+        start = bisect_right(ordinals, self.ordinals[-1]) if self.ordinals else 0
+        if start == len(ordinals):
+            return 0
+        # Label codes of the schedule -> label codes of the archive
+        remap: dict[int, int] = {}
+        for ordinal, code in zip(ordinals[start:], codes[start:]):
+            if (own := remap.get(code)) is None:
+                label = labels[code]
+                key = (label.id, label.name)
+                if (own := self._label_codes.get(key)) is None:
+                    own = self._label_codes[key] = len(self.labels)
+                    self.labels.append(key)
+                remap[code] = own
+            self.ordinals.append(ordinal)
+            self.codes.append(own)
+        self.version += 1
+        return len(ordinals) - start
+
+    def prune(self, min_ordinal: int, max_events: int) -> None:
+        """Drop the events before a day and all but the last max_events."""
+        cut = max(
+            bisect_left(self.ordinals, min_ordinal), len(self.ordinals) - max_events
+        )
+        if cut > 0:
+            del self.ordinals[:cut]
+            del self.codes[:cut]
+            self.version += 1
+
+    def schedule(self, fractions: dict[str, FractionState]) -> Schedule:
+        """Return the archived events, labelled like the current schedule."""
+        labels = tuple(
+            fractions[fraction_id].label
+            if fraction_id in fractions
+            else fraction_label(fraction_id, name)
+            for fraction_id, name in self.labels
+        )
+        return Schedule(self.ordinals, self.codes, labels)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the archive for storage, with days as differences."""
+        ordinals = self.ordinals
+        return {
+            "labels": [list(label) for label in self.labels],
+            "days": [
+                ordinal - previous
+                for previous, ordinal in zip((0, *ordinals), ordinals)
+            ],
+            "codes": self.codes.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AddressPointHistory:
+        """Return an archive read from storage."""
+        return cls(
+            list(accumulate(data["days"])),
+            data["codes"],
+            [(fraction_id, name) for fraction_id, name in data["labels"]],
+        )
+
+
+class ScheduleHistory:
+    """Archives of past collections of all address points, persisted on disk.
+
+    Coordinators append the days that drop out of their schedules (past events
+    in a payload and days passed at the midnight rollover). Archives are kept
+    for HISTORY_RETENTION_DAYS and at most HISTORY_MAX_EVENTS per address
+    point.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without loading from disk."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, HISTORY_STORAGE_VERSION, HISTORY_STORAGE_KEY
+        )
+        self._histories: dict[int, AddressPointHistory] | None = None
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return archive statistics."""
+        histories = self._histories or {}
+        return {
+            "address_points": len(histories),
+            "events": sum(len(history.ordinals) for history in histories.values()),
+            "oldest": min(
+                (
+                    date.fromordinal(history.ordinals[0]).isoformat()
+                    for history in histories.values()
+                    if history.ordinals
+                ),
+                default=None,
+            ),
+        }
+
+    async def async_load(self) -> None:
+        """Load the archives from disk (only once)."""
+        async with self._load_lock:
+            if self._histories is not None:
+                return
+            stored = await self._store.async_load()
+            self._histories = {}
+            for address_point_id, data in ((stored or {}).get("address_points") or {}).items():
+                try:
+                    self._histories[int(address_point_id)] = AddressPointHistory.from_dict(data)
+                except (KeyError, TypeError, ValueError) as err:
+                    _LOGGER.warning(
+                        "Dropping unreadable history of %s: %s", address_point_id, err
+                    )
+            _LOGGER.debug("Loaded history of %s address points", len(self._histories))
+
+    @callback
+    def get(self, address_point_id: int) -> AddressPointHistory | None:
+        """Return the archive of an address point, if any."""
+        if self._histories is None:
+            return None
+        return self._histories.get(address_point_id)
+
+    @callback
+    def async_append(self, address_point_id: int, past: Schedule, today: date) -> None:
+        """Archive the past events of an address point.
+
+        Entries load the archives before processing their first schedule;
+        events seen before that (only outside an entry, e.g. in benchmarks)
+        are not archived.
+        """
+        if self._histories is None or not past:
+            return
+        history = self._histories.get(address_point_id)
+        if history is None:
+            history = self._histories[address_point_id] = AddressPointHistory()
+        if not history.append(past):
+            return
+        history.prune(
+            (today - timedelta(days=HISTORY_RETENTION_DAYS)).toordinal(), HISTORY_MAX_EVENTS
+        )
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    async def async_remove(self, address_point_id: int) -> None:
+        """Forget the archive of an address point."""
+        await self.async_load()
+        assert self._histories is not None
+        if self._histories.pop(address_point_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the archives to write to disk."""
+        return {
+            "address_points": {
+                str(address_point_id): history.as_dict()
+                for address_point_id, history in (self._histories or {}).items()
+            }
+        }
+
+
+@callback
+def async_get_history(hass: HomeAssistant) -> ScheduleHistory:
+    """Return the integration-wide schedule history, creating it if needed."""
+    history: ScheduleHistory | None = hass.data.get(DATA_HISTORY)
+    if history is None:
+        history = hass.data[DATA_HISTORY] = ScheduleHistory(hass)
+    return history
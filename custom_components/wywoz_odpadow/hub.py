@@ -0,0 +1,357 @@
+"""Domain-level hub sharing schedule fetches between config entries."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CACHE_SAVE_DELAY,
+    CACHE_STORAGE_KEY,
+    CACHE_STORAGE_VERSION,
+    DATA_HUB,
+    DEFAULT_MAX_CONCURRENT_FETCHES,
+    DOMAIN,
+)
+from .scheduler import RefreshScheduler
+from .telemetry import RefreshTelemetry
+
+if TYPE_CHECKING:
+    from .coordinator import WywozOdpadowDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WywozOdpadowHub:
+    """Deduplicate schedule fetches by address point across config entries.
+
+    Every coordinator registers with the hub. A refresh of any coordinator runs
+    at most one request per address point at a time: concurrent refreshes for
+    the same address point join the in-flight fetch, and the processed result is
+    pushed to every other coordinator subscribed to that address point.
+    Fetches for different address points run under a bounded semaphore.
+
+    The hub also keeps the last good raw payload per address point on disk, so
+    entries can be set up from it without waiting for the portal. Without
+    fetching, it rolls all schedules over to the new day at local midnight and
+    re-renders them from those payloads when the Home Assistant language changes.
+
+    Periodic refreshes are driven by the hub rather than by each coordinator:
+    every address point gets a slot in a time wheel, at the shortest refresh
+    interval of its subscribers.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent_fetches: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+    ) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._coordinators: dict[int, set[WywozOdpadowDataUpdateCoordinator]] = {}
+        self._inflight: dict[
+            int,
+            tuple[asyncio.Task[dict[str, Any]], set[WywozOdpadowDataUpdateCoordinator]],
+        ] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent_fetches)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, CACHE_STORAGE_VERSION, CACHE_STORAGE_KEY
+        )
+        self._cache: dict[str, dict[str, Any]] | None = None
+        self._cache_lock = asyncio.Lock()
+        # Midnight rollover and language change listeners, while subscribed
+        self._unsub_listeners: list[CALLBACK_TYPE] = []
+        self._language = hass.config.language
+        self._scheduler = RefreshScheduler(hass, self._async_scheduled_refresh)
+        self._last_refresh: dict[int, datetime] = {}
+        self._telemetry: dict[int, RefreshTelemetry] = {}
+
+    @property
+    def address_point_ids(self) -> list[int]:
+        """Return the unique address points with at least one subscriber."""
+        return list(self._coordinators)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return subscription and schedule cache statistics."""
+        return {
+            "address_points": len(self._coordinators),
+            "subscribers": sum(len(subscribers) for subscribers in self._coordinators.values()),
+            "inflight_fetches": len(self._inflight),
+            "cached_schedules": len(self._cache) if self._cache is not None else None,
+            "scheduled_refreshes": len(self._scheduler.scheduled),
+        }
+
+    @callback
+    def next_refresh(self, address_point_id: int) -> datetime | None:
+        """Return when the address point is scheduled to refresh next."""
+        return self._scheduler.scheduled.get(address_point_id)
+
+    @callback
+    def telemetry(self, address_point_id: int) -> RefreshTelemetry:
+        """Return the refresh telemetry of an address point."""
+        if (telemetry := self._telemetry.get(address_point_id)) is None:
+            telemetry = self._telemetry[address_point_id] = RefreshTelemetry()
+        return telemetry
+
+    @callback
+    def async_register(
+        self, coordinator: WywozOdpadowDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Subscribe a coordinator to its address point; return the unsubscribe callback."""
+        address_point_id = coordinator.address_point_id
+        self._coordinators.setdefault(address_point_id, set()).add(coordinator)
+        self.async_schedule_refresh(address_point_id)
+        if not self._unsub_listeners:
+            self._language = self.hass.config.language
+            self._unsub_listeners = [
+                async_track_time_change(
+                    self.hass, self._async_day_changed, hour=0, minute=0, second=0
+                ),
+                self.hass.bus.async_listen(
+                    EVENT_CORE_CONFIG_UPDATE, self._async_core_config_updated
+                ),
+            ]
+
+        @callback
+        def _async_unregister() -> None:
+            """Unsubscribe the coordinator."""
+            subscribers = self._coordinators.get(address_point_id)
+            if subscribers is None:
+                return
+            subscribers.discard(coordinator)
+            if not subscribers:
+                del self._coordinators[address_point_id]
+            self.async_schedule_refresh(address_point_id)
+            if not self._coordinators:
+                for unsub in self._unsub_listeners:
+                    unsub()
+                self._unsub_listeners = []
+
+        return _async_unregister
+
+    async def async_fetch(
+        self, coordinator: WywozOdpadowDataUpdateCoordinator
+    ) -> dict[str, Any]:
+        """Fetch processed schedule data for the coordinator's address point."""
+        address_point_id = coordinator.address_point_id
+
+        if (inflight := self._inflight.get(address_point_id)) is not None:
+            task, waiters = inflight
+            waiters.add(coordinator)
+            _LOGGER.debug(
+                "Joining in-flight fetch for address_point_id: %s", address_point_id
+            )
+            return await asyncio.shield(task)
+
+        task = self.hass.async_create_task(
+            self._async_fetch_limited(coordinator),
+            f"{coordinator.name} fetch {address_point_id}",
+        )
+        waiters = {coordinator}
+        self._inflight[address_point_id] = (task, waiters)
+        try:
+            data = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(address_point_id, None)
+            # Failed attempts also wait for the next slot
+            self._last_refresh[address_point_id] = dt_util.utcnow()
+            self.async_schedule_refresh(address_point_id)
+
+        # Push the result to subscribers that did not take part in this fetch
+        # (an unchanged schedule comes back as the very same object)
+        for subscriber in list(self._coordinators.get(address_point_id, ())):
+            if subscriber not in waiters and subscriber.data is not data:
+                subscriber.async_set_updated_data(data)
+
+        return data
+
+    @callback
+    def async_schedule_refresh(self, address_point_id: int) -> None:
+        """Place the next refresh of an address point in the time wheel."""
+        subscribers = self._polling_subscribers(address_point_id)
+        if not subscribers:
+            self._scheduler.async_unschedule(address_point_id)
+            return
+
+        last_refresh = self._last_refresh.get(address_point_id)
+        if last_refresh is None and (cached := self.cached_payload(address_point_id)):
+            last_refresh = cached[1]
+        self._scheduler.async_schedule(
+            address_point_id,
+            min(coordinator.refresh_interval for coordinator in subscribers),
+            last_refresh,
+        )
+
+    @callback
+    def _polling_subscribers(
+        self, address_point_id: int
+    ) -> list[WywozOdpadowDataUpdateCoordinator]:
+        """Return the subscribers of an address point whose entries have polling enabled."""
+        return [
+            coordinator
+            for coordinator in self._coordinators.get(address_point_id, ())
+            if not (
+                coordinator.config_entry
+                and coordinator.config_entry.pref_disable_polling
+            )
+        ]
+
+    async def _async_scheduled_refresh(self, address_point_id: int) -> None:
+        """Refresh an address point through a loaded subscriber with polling enabled."""
+        refreshing = next(
+            (
+                coordinator
+                for coordinator in self._polling_subscribers(address_point_id)
+                if coordinator.config_entry is None
+                or coordinator.config_entry.state is ConfigEntryState.LOADED
+            ),
+            None,
+        )
+        if refreshing is None:
+            # Entries still setting up or unloading; reschedule the (now overdue) refresh
+            self.async_schedule_refresh(address_point_id)
+            return
+        # The hub pushes the result to the other subscribers
+        await refreshing.async_refresh()
+
+    @callback
+    def _async_day_changed(self, now: datetime) -> None:
+        """Prune past events and recompute countdowns from the cached schedules."""
+        today = now.date()
+        for subscribers in self._coordinators.values():
+            # Subscribers usually share one data object; roll it over only once
+            rolled: dict[int, dict[str, Any]] = {}
+            for coordinator in subscribers:
+                if coordinator.data is None:
+                    continue
+                key = id(coordinator.data)
+                if key not in rolled:
+                    rolled[key] = coordinator.build_data_for_day(coordinator.data, today)
+                coordinator.async_set_day_data(rolled[key], today)
+
+    @callback
+    def _async_core_config_updated(self, event: Event) -> None:
+        """Re-render the schedules when the Home Assistant language changed."""
+        if self.hass.config.language == self._language:
+            return
+        _LOGGER.debug(
+            "Language changed from %s to %s, re-rendering schedules",
+            self._language,
+            self.hass.config.language,
+        )
+        self._language = self.hass.config.language
+        self.hass.async_create_task(
+            self._async_rerender(), f"{DOMAIN} re-render schedules"
+        )
+
+    async def _async_rerender(self) -> None:
+        """Process every schedule again from its cached raw payload, without fetching."""
+        for address_point_id, subscribers in list(self._coordinators.items()):
+            if not subscribers or (cached := self.cached_payload(address_point_id)) is None:
+                continue
+            coordinator, *others = subscribers
+            await coordinator.async_restore_cached(cached[0])
+            for other in others:
+                other.async_set_updated_data(coordinator.data)
+
+    async def async_load_cache(self) -> None:
+        """Load the schedule cache from disk (only once)."""
+        if self._cache is not None:
+            return
+        async with self._cache_lock:
+            if self._cache is not None:
+                return
+            stored = await self._store.async_load()
+            self._cache = (stored or {}).get("schedules", {})
+            _LOGGER.debug("Loaded %s cached schedules", len(self._cache))
+
+    @callback
+    def cached_payload(
+        self, address_point_id: int
+    ) -> tuple[list[dict[str, Any]], datetime] | None:
+        """Return the cached raw payload and its fetch time, if any."""
+        if not self._cache or (cached := self._cache.get(str(address_point_id))) is None:
+            return None
+        fetched_at = dt_util.parse_datetime(cached.get("fetched_at", ""))
+        if not isinstance(cached.get("payload"), list) or fetched_at is None:
+            return None
+        return cached["payload"], fetched_at
+
+    async def async_store_payload(
+        self, address_point_id: int, payload: list[dict[str, Any]]
+    ) -> None:
+        """Remember the last good raw payload for an address point."""
+        await self.async_load_cache()
+        assert self._cache is not None
+        now = dt_util.utcnow().isoformat()
+        previous = self._cache.get(str(address_point_id), {})
+        changed_at = previous.get("changed_at")
+        if changed_at is None or previous.get("payload") != payload:
+            changed_at = now
+        self._cache[str(address_point_id)] = {
+            "payload": payload,
+            "fetched_at": now,
+            "changed_at": changed_at,
+        }
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def async_mark_fetched(self, address_point_id: int) -> None:
+        """Record that the portal returned an unchanged payload."""
+        if self._cache and (cached := self._cache.get(str(address_point_id))):
+            cached["fetched_at"] = dt_util.utcnow().isoformat()
+            self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def schedule_changed_at(self, address_point_id: int) -> datetime | None:
+        """Return when the cached payload of an address point last changed."""
+        if not self._cache or (cached := self._cache.get(str(address_point_id))) is None:
+            return None
+        return dt_util.parse_datetime(cached.get("changed_at") or "")
+
+    async def async_remove_payload(self, address_point_id: int) -> None:
+        """Forget the cached payload for an address point."""
+        await self.async_load_cache()
+        assert self._cache is not None
+        if self._cache.pop(str(address_point_id), None) is not None:
+            self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the cache contents to write to disk."""
+        return {"schedules": self._cache or {}}
+
+    async def _async_fetch_limited(
+        self, coordinator: WywozOdpadowDataUpdateCoordinator
+    ) -> dict[str, Any]:
+        """Run a coordinator fetch under the concurrency limit."""
+        async with self._semaphore:
+            try:
+                return await coordinator.async_fetch_schedule()
+            except UpdateFailed:
+                # Counted by the coordinator with its portal error kind
+                raise
+            except Exception as err:
+                self.telemetry(coordinator.address_point_id).record_failure(
+                    type(err).__name__
+                )
+                raise
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> WywozOdpadowHub:
+    """Return the integration-wide hub, creating it if needed."""
+    hub: WywozOdpadowHub | None = hass.data.get(DATA_HUB)
+    if hub is None:
+        hub = hass.data[DATA_HUB] = WywozOdpadowHub(hass)
+    return hub
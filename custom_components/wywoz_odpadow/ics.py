@@ -0,0 +1,330 @@
+"""iCalendar feeds of the schedules, served over HTTP."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import hashlib
+import hmac
+from http import HTTPStatus
+import secrets
+from typing import Any
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.network import NoURLAvailableError, get_url
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .const import CONF_FEED_TOKEN, DOMAIN, SERVICE_CALENDAR_FEED_URL
+from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .models import FractionLabel
+
+# Calendar name of the feed with the schedules of all entries
+COMBINED_FEED_NAME = "Wywóz Odpadów"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ROTATE_TOKEN = "rotate_token"
+
+# Query parameter with the feed token of an entry; the combined feed takes
+# several and includes the entries whose tokens are given
+TOKEN_PARAM = "token"
+
+# Content lines longer than this many octets are folded (RFC 5545, 3.1)
+MAX_LINE_OCTETS = 75
+
+_ONE_DAY = timedelta(days=1)
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT property value."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line into lines of at most MAX_LINE_OCTETS octets."""
+    if len(line.encode()) <= MAX_LINE_OCTETS:
+        return line
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        octets = len(char.encode())
+        # Continuation lines start with a space
+        if size + octets > MAX_LINE_OCTETS - (1 if parts else 0):
+            parts.append(current)
+            current = ""
+            size = 0
+        current += char
+        size += octets
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _ics_date(day: date) -> str:
+    """Return a DATE value."""
+    return f"{day.year:04d}{day.month:02d}{day.day:02d}"
+
+
+def render_events(address_point_id: int, data: dict[str, Any] | None, stamp: str) -> str:
+    """Return the VEVENT components of an address point's schedule.
+
+    UIDs are derived from the address point, fraction and day, so entries for
+    the same address point and re-rendered versions produce the same events.
+    """
+    if not data:
+        return ""
+    location = _fold(f"LOCATION:{_escape(data['address'])}") if data.get("address") else None
+    # Summary and description lines of each label, escaped and folded once
+    label_lines: dict[FractionLabel, str] = {}
+    lines: list[str] = []
+    for event in data["events"]:
+        label = event.label
+        if (text := label_lines.get(label)) is None:
+            text = label_lines[label] = (
+                _fold(f"SUMMARY:{_escape(label.name)}")
+                + "\r\n"
+                + _fold(f"DESCRIPTION:{_escape(label.description)}")
+            )
+        start = _ics_date(event.start)
+        lines.append("BEGIN:VEVENT")
+        lines.append(f"UID:{address_point_id}-{label.id}-{start}@{DOMAIN}")
+        lines.append(f"DTSTAMP:{stamp}")
+        lines.append(f"DTSTART;VALUE=DATE:{start}")
+        lines.append(f"DTEND;VALUE=DATE:{_ics_date(event.start + _ONE_DAY)}")
+        lines.append(text)
+        if location:
+            lines.append(location)
+        lines.append("TRANSP:TRANSPARENT")
+        lines.append("END:VEVENT")
+    lines.append("")
+    return "\r\n".join(lines)
+
+
+def render_calendar(name: str, events: list[str]) -> bytes:
+    """Return an iCalendar document around rendered VEVENT components."""
+    header = "\r\n".join(
+        (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:-//{DOMAIN}//Home Assistant//PL",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            _fold(f"X-WR-CALNAME:{_escape(name)}"),
+            "",
+        )
+    )
+    return (header + "".join(events) + "END:VCALENDAR\r\n").encode()
+
+
+def feed_token(entry: ConfigEntry) -> str | None:
+    """Return the feed token of an entry."""
+    return entry.data.get(DOMAIN, {}).get(CONF_FEED_TOKEN)
+
+
+@callback
+def async_ensure_feed_token(
+    hass: HomeAssistant, entry: ConfigEntry, rotate: bool = False
+) -> str:
+    """Return the feed token of an entry, creating or replacing it in the entry data."""
+    token = feed_token(entry)
+    if token is None or rotate:
+        token = secrets.token_urlsafe(32)
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, DOMAIN: {**entry.data[DOMAIN], CONF_FEED_TOKEN: token}}
+        )
+    return token
+
+
+def _token_matches(tokens: list[str], expected: str | None) -> bool:
+    """Return True if one of the tokens is the expected one, in constant time."""
+    if expected is None:
+        return False
+    expected_bytes = expected.encode()
+    return any(hmac.compare_digest(token.encode(), expected_bytes) for token in tokens)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True if an If-None-Match header matches the entity tag."""
+    if if_none_match is None:
+        return False
+    return any(
+        tag.strip() in ("*", etag) or tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+class IcsFeedView(HomeAssistantView):
+    """The schedule of one entry, or of several entries, as an iCalendar document.
+
+    Calendar subscriptions cannot send an Authorization header, so a feed is
+    served to requests with the entry's feed token in the query, as well as to
+    authenticated requests (including signed paths). The combined feed holds
+    the entries whose tokens are given, or all entries for an authenticated
+    request without tokens.
+
+    Documents are rendered once per data version and served as cached bytes;
+    clients sending the ETag of the current version get 304 Not Modified.
+    """
+
+    url = f"/api/{DOMAIN}/calendar/{{entry_id}}.ics"
+    extra_urls = [f"/api/{DOMAIN}/calendar.ics"]
+    name = f"api:{DOMAIN}:calendar"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without rendered documents."""
+        self.hass = hass
+        # Entry id (the selected entry ids for the combined feed) -> (data
+        # versions, body, ETag)
+        self._documents: dict[
+            str | tuple[str, ...], tuple[tuple[Any, ...], bytes, str]
+        ] = {}
+        # Address point id -> (data version, rendered VEVENTs)
+        self._events: dict[int, tuple[Any, str]] = {}
+
+    async def get(self, request: web.Request, entry_id: str | None = None) -> web.Response:
+        """Return the feed, or 304 Not Modified if the client has it."""
+        coordinators: dict[str, WywozOdpadowDataUpdateCoordinator] = self.hass.data.get(
+            DOMAIN, {}
+        )
+        tokens = request.query.getall(TOKEN_PARAM, [])
+        authenticated = request.get(KEY_AUTHENTICATED, False)
+
+        if entry_id is None:
+            if tokens:
+                selected = {
+                    selected_id: coordinator
+                    for selected_id, coordinator in coordinators.items()
+                    if self._authorized(selected_id, tokens)
+                }
+            else:
+                selected = dict(coordinators) if authenticated else {}
+            if not selected and not authenticated:
+                return self.json_message("Unauthorized", HTTPStatus.UNAUTHORIZED)
+            key: str | tuple[str, ...] = tuple(selected)
+            name = COMBINED_FEED_NAME
+        else:
+            if not authenticated and not self._authorized(entry_id, tokens):
+                return self.json_message("Unauthorized", HTTPStatus.UNAUTHORIZED)
+            if (coordinator := coordinators.get(entry_id)) is None:
+                self._documents.pop(entry_id, None)
+                return self.json_message("Entry not found", HTTPStatus.NOT_FOUND)
+            selected = {entry_id: coordinator}
+            key = entry_id
+            name = (coordinator.data or {}).get("address") or COMBINED_FEED_NAME
+
+        body, etag = self._document(key, name, list(selected.values()))
+        if entry_id is None:
+            self._forget_removed(coordinators)
+        headers = {hdrs.ETAG: etag, hdrs.CACHE_CONTROL: "private, no-cache"}
+        if _etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), etag):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.Response(
+            body=body, content_type="text/calendar", charset="utf-8", headers=headers
+        )
+
+    @callback
+    def _authorized(self, entry_id: str, tokens: list[str]) -> bool:
+        """Return True if one of the tokens is the feed token of the entry."""
+        if (entry := self.hass.config_entries.async_get_entry(entry_id)) is None:
+            return False
+        return _token_matches(tokens, feed_token(entry))
+
+    @callback
+    def _forget_removed(
+        self, coordinators: dict[str, WywozOdpadowDataUpdateCoordinator]
+    ) -> None:
+        """Drop rendered documents and events of entries that were removed."""
+        self._documents = {
+            key: document
+            for key, document in self._documents.items()
+            if coordinators.keys() >= ({key} if isinstance(key, str) else set(key))
+        }
+        address_point_ids = {
+            coordinator.address_point_id for coordinator in coordinators.values()
+        }
+        self._events = {
+            address_point_id: events
+            for address_point_id, events in self._events.items()
+            if address_point_id in address_point_ids
+        }
+
+    @callback
+    def _document(
+        self,
+        key: str | tuple[str, ...],
+        name: str,
+        coordinators: list[WywozOdpadowDataUpdateCoordinator],
+    ) -> tuple[bytes, str]:
+        """Return the body and ETag of a feed, rendering it on a new data version."""
+        versions = tuple(coordinator.data for coordinator in coordinators)
+        cached = self._documents.get(key)
+        # The cache holds the data objects, so identity means the same version
+        if (
+            cached is not None
+            and len(cached[0]) == len(versions)
+            and all(old is new for old, new in zip(cached[0], versions))
+        ):
+            return cached[1], cached[2]
+
+        stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        events: dict[int, str] = {}
+        for coordinator, data in zip(coordinators, versions):
+            # Entries for the same address point appear once in the combined feed
+            address_point_id = coordinator.address_point_id
+            if address_point_id in events:
+                continue
+            rendered = self._events.get(address_point_id)
+            if rendered is None or rendered[0] is not data:
+                rendered = self._events[address_point_id] = (
+                    data,
+                    render_events(address_point_id, data, stamp),
+                )
+            events[address_point_id] = rendered[1]
+
+        body = render_calendar(name, list(events.values()))
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._documents[key] = (versions, body, etag)
+        return body, etag
+
+
+@callback
+def async_setup_feed_service(hass: HomeAssistant) -> None:
+    """Register the service returning (and rotating) the feed URL of an entry."""
+
+    async def _async_feed_url(call: ServiceCall) -> dict[str, Any]:
+        """Return the feed URL of an entry, with a new token if asked to."""
+        entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+        if entry is None or entry.domain != DOMAIN:
+            raise HomeAssistantError(
+                f"Unknown config entry: {call.data[ATTR_CONFIG_ENTRY_ID]}"
+            )
+        token = async_ensure_feed_token(hass, entry, call.data[ATTR_ROTATE_TOKEN])
+        path = f"/api/{DOMAIN}/calendar/{entry.entry_id}.ics?{TOKEN_PARAM}={token}"
+        try:
+            base_url = get_url(hass, prefer_external=True)
+        except NoURLAvailableError:
+            base_url = ""
+        return {"url": f"{base_url}{path}", "token": token}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALENDAR_FEED_URL,
+        _async_feed_url,
+        schema=vol.Schema(
+            {
+                vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+                vol.Optional(ATTR_ROTATE_TOKEN, default=False): cv.boolean,
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
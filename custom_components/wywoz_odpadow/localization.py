@@ -0,0 +1,78 @@
+"""Domain-wide cache of translated fraction names."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import translation
+
+from .const import DATA_FRACTION_TRANSLATIONS, DOMAIN, PORTAL_LANGUAGE
+
+_LOGGER = logging.getLogger(__name__)
+
+_KEY_PREFIX = f"component.{DOMAIN}.common.fraction_"
+
+
+class FractionTranslations:
+    """Fraction names by id_frakcja, loaded once per language for all entries.
+
+    Home Assistant falls back to English for languages without a translation
+    file, so no translations are used in the portal's own language: the
+    fraction names it returns are already Polish.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._translations: dict[str, dict[str, str]] = {}
+        self._loading: dict[str, asyncio.Task[dict[str, str]]] = {}
+
+    async def async_get(self, language: str) -> dict[str, str]:
+        """Return the fraction names of a language, loading them on first use."""
+        if (translations := self._translations.get(language)) is not None:
+            return translations
+        if (task := self._loading.get(language)) is None:
+            task = self._loading[language] = self.hass.async_create_task(
+                self._async_load(language), f"{DOMAIN} fraction translations {language}"
+            )
+            task.add_done_callback(lambda _: self._loading.pop(language, None))
+        return await asyncio.shield(task)
+
+    async def _async_load(self, language: str) -> dict[str, str]:
+        """Load the fraction names of a language from the translation files."""
+        if language.split("-")[0] == PORTAL_LANGUAGE:
+            translations: dict[str, str] = {}
+        else:
+            try:
+                strings = await translation.async_get_translations(
+                    self.hass, language, "common", [DOMAIN]
+                )
+            except (HomeAssistantError, OSError, ValueError) as err:
+                # Not cached, so the next refresh tries again
+                _LOGGER.warning(
+                    "Could not load fraction translations for %s, using portal names: %s",
+                    language,
+                    err,
+                )
+                return {}
+            # Keys are component.<domain>.common.fraction_op; the portal's
+            # id_frakcja is upper case
+            translations = {
+                key[len(_KEY_PREFIX) :].upper(): value
+                for key, value in strings.items()
+                if key.startswith(_KEY_PREFIX) and isinstance(value, str)
+            }
+        _LOGGER.debug("Loaded %s fraction translations for %s", len(translations), language)
+        self._translations[language] = translations
+        return translations
+
+
+@callback
+def async_get_fraction_translations(hass: HomeAssistant) -> FractionTranslations:
+    """Return the integration-wide fraction translation cache, creating it if needed."""
+    cache: FractionTranslations | None = hass.data.get(DATA_FRACTION_TRANSLATIONS)
+    if cache is None:
+        cache = hass.data[DATA_FRACTION_TRANSLATIONS] = FractionTranslations(hass)
+    return cache
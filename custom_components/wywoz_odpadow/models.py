@@ -0,0 +1,187 @@
+"""Compact schedule records for Wywóz Odpadów.
+
+A yearly schedule holds a couple of hundred collection days per address point.
+Schedules are stored as columns: the dates as ordinals in an array and the
+fraction of each date as a small code into a tuple of labels. The translated
+name and description of a fraction are interned once and shared by all
+events and address points. ScheduleEvent records are only built when an event
+is read, so a stored schedule holds no per-event Python objects at all.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache, partial
+import sys
+from typing import NamedTuple, overload
+
+
+@dataclass(frozen=True, slots=True)
+class FractionLabel:
+    """Display strings of a waste fraction, shared by all its events."""
+
+    id: str
+    name: str
+    description: str
+
+
+@lru_cache(maxsize=256)
+def fraction_label(fraction_id: str, name: str) -> FractionLabel:
+    """Return the interned label of a fraction under its translated name."""
+    name = sys.intern(name)
+    return FractionLabel(sys.intern(fraction_id), name, f"Wywóz: {name}")
+
+
+class ScheduleEvent(NamedTuple):
+    """A collection day of one fraction."""
+
+    start: date
+    label: FractionLabel
+
+    @property
+    def end(self) -> date:
+        """Return the end of the (all-day) event."""
+        return self.start
+
+    @property
+    def fraction_id(self) -> str:
+        """Return the id_frakcja of the fraction."""
+        return self.label.id
+
+    @property
+    def summary(self) -> str:
+        """Return the translated fraction name."""
+        return self.label.name
+
+    @property
+    def description(self) -> str:
+        """Return the event description."""
+        return self.label.description
+
+
+# Builds a ScheduleEvent from a (start, label) pair, skipping the Python-level
+# __new__ of named tuples
+_make_event = partial(tuple.__new__, ScheduleEvent)
+
+
+class Schedule(Sequence[ScheduleEvent]):
+    """Collection days sorted by date, stored as columns.
+
+    Immutable: slicing returns a new schedule sharing the labels.
+    """
+
+    __slots__ = ("_ordinals", "_codes", "_labels")
+
+    def __init__(
+        self,
+        ordinals: Iterable[int] = (),
+        codes: Iterable[int] = (),
+        labels: tuple[FractionLabel, ...] = (),
+    ) -> None:
+        """Initialize from date ordinals and label codes in the same order."""
+        self._ordinals = array("i", ordinals)
+        self._codes = array("H", codes)
+        self._labels = labels
+        if len(self._ordinals) != len(self._codes):
+            raise ValueError("ordinals and codes differ in length")
+        # Portal schedules come sorted; the check is a linear pass in C
+        ordered = sorted(self._ordinals)
+        if ordered != self._ordinals.tolist():
+            order = sorted(range(len(ordered)), key=self._ordinals.__getitem__)
+            self._ordinals = array("i", ordered)
+            self._codes = array("H", [self._codes[index] for index in order])
+
+    def __len__(self) -> int:
+        """Return the number of events."""
+        return len(self._ordinals)
+
+    @overload
+    def __getitem__(self, index: int) -> ScheduleEvent: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Schedule: ...
+
+    def __getitem__(self, index: int | slice) -> ScheduleEvent | Schedule:
+        """Return the event at an index or the schedule of a slice."""
+        if isinstance(index, slice):
+            schedule = Schedule.__new__(Schedule)
+            schedule._ordinals = self._ordinals[index]
+            schedule._codes = self._codes[index]
+            schedule._labels = self._labels
+            return schedule
+        return _make_event(
+            (date.fromordinal(self._ordinals[index]), self._labels[self._codes[index]])
+        )
+
+    def __iter__(self) -> Iterator[ScheduleEvent]:
+        """Iterate over the events in date order."""
+        labels = self._labels
+        for ordinal, code in zip(self._ordinals, self._codes):
+            yield _make_event((date.fromordinal(ordinal), labels[code]))
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both schedules have the same events."""
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        if self._ordinals != other._ordinals:
+            return False
+        # Same label table (the usual case): compare the codes in C
+        if self._labels == other._labels:
+            return self._codes == other._codes
+        return [self._labels[code] for code in self._codes] == [
+            other._labels[code] for code in other._codes
+        ]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a short representation."""
+        return f"<Schedule {len(self)} events>"
+
+    def columns(self) -> tuple[array[int], array[int], tuple[FractionLabel, ...]]:
+        """Return the date ordinal and label code columns and the label table."""
+        return self._ordinals, self._codes, self._labels
+
+    def bisect_left(self, day: date, lo: int = 0) -> int:
+        """Return the index of the first event on or after the day."""
+        return bisect_left(self._ordinals, day.toordinal(), lo)
+
+    def bisect_right(self, day: date, lo: int = 0) -> int:
+        """Return the index of the first event after the day."""
+        return bisect_right(self._ordinals, day.toordinal(), lo)
+
+    def next_dates(self) -> dict[str, date]:
+        """Return the first date of every fraction in the schedule."""
+        first: dict[int, int] = {}
+        for ordinal, code in zip(self._ordinals, self._codes):
+            first.setdefault(code, ordinal)
+        next_dates: dict[str, date] = {}
+        for code, ordinal in first.items():
+            fraction_id = self._labels[code].id
+            day = date.fromordinal(ordinal)
+            if fraction_id not in next_dates or day < next_dates[fraction_id]:
+                next_dates[fraction_id] = day
+        return next_dates
+
+
+@dataclass(frozen=True, slots=True)
+class FractionState:
+    """The next collection of a fraction, as shown by its sensor."""
+
+    label: FractionLabel
+    type: str
+    next_date: date | None = None
+    days_until: int | None = None
+
+    @property
+    def id(self) -> str:
+        """Return the id_frakcja of the fraction."""
+        return self.label.id
+
+    @property
+    def name(self) -> str:
+        """Return the translated fraction name."""
+        return self.label.name
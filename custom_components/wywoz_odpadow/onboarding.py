@@ -0,0 +1,171 @@
+"""Bulk import of address points as config entries."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import logging
+from typing import Any
+
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
+
+from .config_flow import CannotConnect, InvalidData, NoScheduleFound, validate_input
+from .const import (
+    CONF_ADAPTIVE_REFRESH,
+    CONF_ADDRESS_POINT_ID,
+    CONF_SAFETY_MARGIN,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_SAFETY_MARGIN_DAYS,
+    DEFAULT_UPDATE_INTERVAL_DAYS,
+    DOMAIN,
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_ADDRESS_POINTS,
+    IMPORT_MAX_CONCURRENT_VALIDATIONS,
+    SERVICE_IMPORT_ADDRESSES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_ADDRESS_POINT_IDS = "address_point_ids"
+
+# Per-address results; the validation errors match the config flow's
+RESULT_OK = "ok"
+RESULT_ALREADY_CONFIGURED = "already_configured"
+RESULT_CANNOT_CONNECT = "cannot_connect"
+RESULT_NO_SCHEDULE_FOUND = "no_schedule_found"
+RESULT_INVALID_DATA = "invalid_data"
+RESULT_UNKNOWN = "unknown"
+
+IMPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ADDRESS_POINT_IDS): vol.All(
+            cv.ensure_list,
+            [vol.All(vol.Coerce(int), vol.Range(min=1))],
+            vol.Length(min=1, max=IMPORT_MAX_ADDRESS_POINTS),
+        ),
+        vol.Optional(CONF_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=7)
+        ),
+        vol.Optional(CONF_ADAPTIVE_REFRESH, default=False): cv.boolean,
+        vol.Optional(CONF_SAFETY_MARGIN, default=DEFAULT_SAFETY_MARGIN_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=30)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_import_service(hass: HomeAssistant) -> None:
+    """Register the bulk import service."""
+    lock = asyncio.Lock()
+
+    async def _async_import(call: ServiceCall) -> dict[str, Any]:
+        """Validate and add the address points, one import at a time."""
+        if lock.locked():
+            raise HomeAssistantError("An import is already running")
+        async with lock:
+            return await async_import_address_points(
+                hass,
+                call.data[ATTR_ADDRESS_POINT_IDS],
+                {
+                    CONF_UPDATE_INTERVAL: call.data[CONF_UPDATE_INTERVAL] * 86400,
+                    CONF_ADAPTIVE_REFRESH: call.data[CONF_ADAPTIVE_REFRESH],
+                    CONF_SAFETY_MARGIN: call.data[CONF_SAFETY_MARGIN],
+                },
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_ADDRESSES,
+        _async_import,
+        schema=IMPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def async_import_address_points(
+    hass: HomeAssistant, address_point_ids: list[int], options: dict[str, Any]
+) -> dict[str, Any]:
+    """Validate address points concurrently and create entries for the valid ones.
+
+    Validation goes through the shared API client and seeds the schedule
+    cache, so the new entries set up without fetching again. Entries are
+    created in batches to bound the number of setups running at once.
+    """
+    configured = {
+        entry.data.get(DOMAIN, {}).get(CONF_ADDRESS_POINT_ID)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    requested = list(dict.fromkeys(address_point_ids))
+    results: dict[int, dict[str, Any]] = {}
+    pending: list[int] = []
+    for address_point_id in requested:
+        if address_point_id in configured:
+            results[address_point_id] = {"result": RESULT_ALREADY_CONFIGURED}
+        else:
+            pending.append(address_point_id)
+
+    semaphore = asyncio.Semaphore(IMPORT_MAX_CONCURRENT_VALIDATIONS)
+
+    async def _async_validate(address_point_id: int) -> dict[str, Any]:
+        """Return the validation result of one address point."""
+        async with semaphore:
+            try:
+                info = await validate_input(
+                    hass, {CONF_ADDRESS_POINT_ID: address_point_id}
+                )
+            except CannotConnect as err:
+                return {"result": RESULT_CANNOT_CONNECT, "detail": str(err)}
+            except NoScheduleFound as err:
+                return {"result": RESULT_NO_SCHEDULE_FOUND, "detail": str(err)}
+            except InvalidData as err:
+                return {"result": RESULT_INVALID_DATA, "detail": str(err)}
+            except Exception as err:
+                _LOGGER.exception("Unexpected error validating %s", address_point_id)
+                return {"result": RESULT_UNKNOWN, "detail": str(err)}
+            return {"result": RESULT_OK, "title": info["title"]}
+
+    validated = await asyncio.gather(
+        *(_async_validate(address_point_id) for address_point_id in pending)
+    )
+    results.update(zip(pending, validated))
+
+    valid = [
+        address_point_id
+        for address_point_id in pending
+        if results[address_point_id]["result"] == RESULT_OK
+    ]
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        batch = valid[start : start + IMPORT_BATCH_SIZE]
+        flow_results = await asyncio.gather(
+            *(
+                hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": SOURCE_IMPORT},
+                    data={
+                        "title": results[address_point_id]["title"],
+                        DOMAIN: {CONF_ADDRESS_POINT_ID: address_point_id, **options},
+                    },
+                )
+                for address_point_id in batch
+            )
+        )
+        for address_point_id, flow_result in zip(batch, flow_results):
+            if flow_result["type"] != FlowResultType.CREATE_ENTRY:
+                results[address_point_id]["result"] = flow_result.get(
+                    "reason", RESULT_UNKNOWN
+                )
+
+    summary = Counter(result["result"] for result in results.values())
+    _LOGGER.info("Imported address points: %s", dict(summary))
+    return {
+        "summary": dict(summary),
+        "results": [
+            {"address_point_id": address_point_id, **results[address_point_id]}
+            for address_point_id in requested
+        ],
+    }
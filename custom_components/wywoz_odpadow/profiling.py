@@ -0,0 +1,219 @@
+"""On-demand profiling of the integration's hot paths.
+
+Timing spans are installed by wrapping the profiled methods on their classes
+for the duration of a profiling window and removing the wrappers afterwards,
+so nothing is measured (and nothing costs anything) outside a window.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import cProfile
+from functools import wraps
+import inspect
+import logging
+from pathlib import Path
+from time import perf_counter
+import tracemalloc
+from typing import Any
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .calendar import WywozOdpadowCalendar
+from .const import (
+    DOMAIN,
+    PROFILE_DEFAULT_DURATION,
+    PROFILE_MAX_DURATION,
+    SERVICE_PROFILE,
+)
+from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .sensor import WywozOdpadowFractionSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_DURATION = "duration"
+ATTR_CPROFILE = "cprofile"
+ATTR_TRACEMALLOC = "tracemalloc"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=PROFILE_DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=PROFILE_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+        vol.Optional(ATTR_TRACEMALLOC, default=False): cv.boolean,
+    }
+)
+
+# (class, method, span name) measured during a profiling window
+PROFILED_METHODS: tuple[tuple[type, str, str], ...] = (
+    (WywozOdpadowDataUpdateCoordinator, "_async_update_data", "coordinator.update_data"),
+    (WywozOdpadowDataUpdateCoordinator, "_process_data", "coordinator.process_data"),
+    (
+        WywozOdpadowDataUpdateCoordinator,
+        "_load_fraction_translations",
+        "coordinator.load_fraction_translations",
+    ),
+    (WywozOdpadowCalendar, "async_get_events", "calendar.get_events"),
+    (WywozOdpadowCalendar, "async_write_ha_state", "calendar.write_state"),
+    (WywozOdpadowFractionSensor, "async_write_ha_state", "sensor.write_state"),
+)
+
+_NOT_SET = object()
+
+
+class SpanRecorder:
+    """Wall-clock durations of the profiled methods during one window."""
+
+    def __init__(self) -> None:
+        """Initialize without spans."""
+        self._durations: dict[str, list[float]] = {}
+        self._originals: list[tuple[type, str, Any]] = []
+
+    def install(self) -> None:
+        """Wrap the profiled methods."""
+        for cls, method, name in PROFILED_METHODS:
+            # Inherited methods are shadowed on the class and deleted afterwards
+            self._originals.append((cls, method, cls.__dict__.get(method, _NOT_SET)))
+            setattr(cls, method, self._wrap(name, getattr(cls, method)))
+
+    def uninstall(self) -> None:
+        """Restore the profiled methods."""
+        for cls, method, original in reversed(self._originals):
+            if original is _NOT_SET:
+                delattr(cls, method)
+            else:
+                setattr(cls, method, original)
+        self._originals.clear()
+
+    def _wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return the function wrapped in a timing span."""
+        durations = self._durations.setdefault(name, [])
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_span(*args: Any, **kwargs: Any) -> Any:
+                start = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    durations.append(perf_counter() - start)
+
+            return async_span
+
+        @wraps(func)
+        def span(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                durations.append(perf_counter() - start)
+
+        return span
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return count and total/mean/p95/max milliseconds per span."""
+        summary = {}
+        for name, durations in self._durations.items():
+            if not durations:
+                summary[name] = {"count": 0}
+                continue
+            ordered = sorted(durations)
+            summary[name] = {
+                "count": len(ordered),
+                "total_ms": round(sum(ordered) * 1000, 3),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return summary
+
+
+@callback
+def async_setup_profile_service(hass: HomeAssistant) -> None:
+    """Register the profiling service."""
+    lock = asyncio.Lock()
+
+    async def _async_profile(call: ServiceCall) -> dict[str, Any]:
+        """Measure the profiled methods for a window and write optional snapshots."""
+        if lock.locked():
+            raise HomeAssistantError("A profiling window is already running")
+        async with lock:
+            return await _async_run_profile(
+                hass,
+                call.data[ATTR_DURATION],
+                call.data[ATTR_CPROFILE],
+                call.data[ATTR_TRACEMALLOC],
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_run_profile(
+    hass: HomeAssistant, duration: float, profile: bool, trace_memory: bool
+) -> dict[str, Any]:
+    """Run one profiling window and return the span summary and written files."""
+    profiler: cProfile.Profile | None = None
+    if profile:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as err:
+            # Another profiler (e.g. the Profiler integration) is active
+            raise HomeAssistantError(f"Cannot start cProfile: {err}") from err
+    # Leave tracemalloc running if someone else started it
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    recorder = SpanRecorder()
+    recorder.install()
+    _LOGGER.info("Profiling for %s seconds", duration)
+    try:
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            recorder.uninstall()
+            if profiler is not None:
+                profiler.disable()
+        stamp = dt_util.utcnow().strftime("%Y%m%d_%H%M%S")
+        base = Path(hass.config.path(f"{DOMAIN}_profile_{stamp}"))
+        files = await hass.async_add_executor_job(
+            _write_snapshots, base, profiler, trace_memory
+        )
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    summary = recorder.summary()
+    _LOGGER.info("Profiling spans: %s", summary)
+    if files:
+        _LOGGER.info("Profiling snapshots written to: %s", ", ".join(files))
+    return {"spans": summary, "files": files}
+
+
+def _write_snapshots(
+    base: Path, profiler: cProfile.Profile | None, trace_memory: bool
+) -> list[str]:
+    """Write the cProfile stats and a tracemalloc snapshot next to each other."""
+    files = []
+    if profiler is not None:
+        path = base.with_suffix(".cprof")
+        profiler.dump_stats(path)
+        files.append(str(path))
+    if trace_memory:
+        path = base.with_suffix(".tracemalloc")
+        tracemalloc.take_snapshot().dump(str(path))
+        files.append(str(path))
+    return files
@@ -0,0 +1,157 @@
+"""Retry, timeout and circuit breaker policies for portal requests."""
+from __future__ import annotations
+
+import logging
+import random
+from time import monotonic
+
+import aiohttp
+
+from .const import (
+    ADAPTIVE_TIMEOUT_MIN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CIRCUIT_RESET_TIMEOUT_MAX,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request while the portal is considered down."""
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the delay before retry number ``attempt`` (0-based).
+
+    Exponential backoff with full jitter, so clients that failed together do
+    not retry together.
+    """
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt))
+
+
+class AdaptiveTimeout:
+    """Request timeout derived from observed portal latency.
+
+    Keeps smoothed latency and its mean deviation (as TCP does for its
+    retransmission timeout) and allows ``srtt + 4 * rttvar``, bounded by a
+    minimum and by the caller's own timeout.
+    """
+
+    def __init__(self, minimum: float = ADAPTIVE_TIMEOUT_MIN) -> None:
+        """Initialize without samples."""
+        self._minimum = minimum
+        self._srtt: float | None = None
+        self._rttvar = 0.0
+
+    def timeout(self, maximum: float) -> float:
+        """Return the timeout to use for a request allowed at most ``maximum`` seconds."""
+        if self._srtt is None:
+            return maximum
+        return min(maximum, max(self._minimum, self._srtt + 4 * self._rttvar))
+
+    def record(self, latency: float) -> None:
+        """Add the latency of a successful request."""
+        if self._srtt is None:
+            self._srtt = latency
+            self._rttvar = latency / 2
+            return
+        self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - latency)
+        self._srtt = 0.875 * self._srtt + 0.125 * latency
+
+    @property
+    def smoothed_latency(self) -> float | None:
+        """Return the smoothed latency in seconds."""
+        return self._srtt
+
+
+class CircuitBreaker:
+    """Integration-wide circuit breaker for the portal.
+
+    After enough consecutive failures the circuit opens and every request is
+    short-circuited. Once the reset timeout has passed a single probe request
+    is let through: success closes the circuit, failure opens it again with a
+    doubled reset timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        max_reset_timeout: float = CIRCUIT_RESET_TIMEOUT_MAX,
+    ) -> None:
+        """Initialize a closed circuit."""
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.trips = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        """Return the circuit state."""
+        return self._state
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self._state == STATE_CLOSED:
+            return
+        if (
+            self._state == STATE_OPEN
+            and monotonic() - self._opened_at >= self._reset_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+        if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+            _LOGGER.debug("Sending probe request to the portal")
+            self._probe_in_flight = True
+            return
+        self.short_circuited += 1
+        raise CircuitOpenError(
+            "Portal unavailable, not retrying for "
+            f"{max(0, self._reset_timeout - (monotonic() - self._opened_at)):.0f} s"
+        )
+
+    def record_success(self) -> None:
+        """Record a successful request and close the circuit."""
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("Portal is available again")
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+        self._reset_timeout = self._base_reset_timeout
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if needed."""
+        self._failures += 1
+        if self._state == STATE_HALF_OPEN:
+            self._probe_in_flight = False
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._open()
+        elif self._state == STATE_CLOSED and self._failures >= self._failure_threshold:
+            self.trips += 1
+            _LOGGER.warning(
+                "Portal failed %s times in a row, pausing requests for %.0f s",
+                self._failures,
+                self._reset_timeout,
+            )
+            self._open()
+
+    def abort_probe(self) -> None:
+        """Forget a probe that was cancelled before it completed."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        """Open the circuit."""
+        self._state = STATE_OPEN
+        self._opened_at = monotonic()
@@ -0,0 +1,160 @@
+"""Time-wheel scheduler spreading schedule refreshes evenly over time."""
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine
+from datetime import datetime, timedelta
+import logging
+import math
+from typing import Any
+import zlib
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    SCHEDULER_SLOT_SECONDS,
+    SCHEDULER_STARTUP_DELAY,
+    SCHEDULER_STARTUP_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def slot_phase(address_point_id: int) -> float:
+    """Return the deterministic position (0 <= phase < 1) of an address point in any interval."""
+    return zlib.crc32(str(address_point_id).encode()) / 2**32
+
+
+class RefreshScheduler:
+    """Run refreshes of address points in fixed slots of a time wheel.
+
+    Every address point refreshes at the same phase of its interval, derived
+    from a hash of its id (e.g. always at the same time of day for a daily
+    interval), so refreshes of many address points are spread evenly instead
+    of following the moment each entry was set up. Refreshes that are already
+    overdue, e.g. after a restart, are spread over a startup window instead of
+    running all at once. A single timer fires at the earliest occupied slot.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        refresh: Callable[[int], Coroutine[Any, Any, None]],
+        slot_seconds: int = SCHEDULER_SLOT_SECONDS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._refresh = refresh
+        self._slot_seconds = slot_seconds
+        self._started = dt_util.utcnow()
+        # slot number (seconds since the epoch // slot length) -> address point ids
+        self._slots: dict[int, set[int]] = {}
+        self._slot_of: dict[int, int] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._timer_slot: int | None = None
+
+    @callback
+    def async_schedule(
+        self,
+        address_point_id: int,
+        interval: timedelta,
+        last_refresh: datetime | None,
+    ) -> datetime:
+        """(Re)schedule the next refresh of an address point and return its time."""
+        when = self._next_refresh(address_point_id, interval, last_refresh)
+        slot = math.ceil(when.timestamp() / self._slot_seconds)
+        self._remove(address_point_id)
+        self._slots.setdefault(slot, set()).add(address_point_id)
+        self._slot_of[address_point_id] = slot
+        _LOGGER.debug(
+            "Next refresh of address_point_id %s at %s",
+            address_point_id,
+            dt_util.utc_from_timestamp(slot * self._slot_seconds),
+        )
+        self._async_arm_timer()
+        return when
+
+    @callback
+    def async_unschedule(self, address_point_id: int) -> None:
+        """Cancel the scheduled refresh of an address point."""
+        self._remove(address_point_id)
+        self._async_arm_timer()
+
+    @property
+    def scheduled(self) -> dict[int, datetime]:
+        """Return the scheduled refresh time of every address point."""
+        return {
+            address_point_id: dt_util.utc_from_timestamp(slot * self._slot_seconds)
+            for address_point_id, slot in self._slot_of.items()
+        }
+
+    def _next_refresh(
+        self,
+        address_point_id: int,
+        interval: timedelta,
+        last_refresh: datetime | None,
+    ) -> datetime:
+        """Return the slot point of the address point nearest to its due time."""
+        now = dt_util.utcnow()
+        interval_seconds = interval.total_seconds()
+        phase = slot_phase(address_point_id)
+
+        if last_refresh is not None:
+            due = (last_refresh + interval).timestamp()
+            offset = phase * interval_seconds
+            # Nearest point of the form k * interval + offset, so the data age
+            # stays within half an interval of the configured one
+            when = offset + round((due - offset) / interval_seconds) * interval_seconds
+            if when <= now.timestamp() < due:
+                when += interval_seconds
+            if when > now.timestamp():
+                return dt_util.utc_from_timestamp(when)
+
+        # Overdue or never fetched: spread over the startup window
+        window = min(SCHEDULER_STARTUP_WINDOW, interval_seconds)
+        earliest = max(now, self._started + timedelta(seconds=SCHEDULER_STARTUP_DELAY))
+        return earliest + timedelta(seconds=phase * window)
+
+    def _remove(self, address_point_id: int) -> None:
+        """Remove an address point from its slot."""
+        if (slot := self._slot_of.pop(address_point_id, None)) is None:
+            return
+        members = self._slots[slot]
+        members.discard(address_point_id)
+        if not members:
+            del self._slots[slot]
+
+    @callback
+    def _async_arm_timer(self) -> None:
+        """Point the timer at the earliest occupied slot."""
+        next_slot = min(self._slots, default=None)
+        if next_slot == self._timer_slot:
+            return
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_slot = next_slot
+        if next_slot is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass,
+                self._async_tick,
+                dt_util.utc_from_timestamp(next_slot * self._slot_seconds),
+            )
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Start the refreshes of every slot that is due."""
+        self._unsub_timer = None
+        self._timer_slot = None
+        current = math.floor(
+            max(now, dt_util.utcnow()).timestamp() / self._slot_seconds
+        )
+        for slot in sorted(slot for slot in self._slots if slot <= current):
+            for address_point_id in self._slots.pop(slot):
+                del self._slot_of[address_point_id]
+                self.hass.async_create_background_task(
+                    self._refresh(address_point_id),
+                    f"wywoz_odpadow scheduled refresh {address_point_id}",
+                )
+        self._async_arm_timer()
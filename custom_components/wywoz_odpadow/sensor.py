@@ -1,18 +1,14 @@
 """Sensor platform for Wywóz Odpadów."""
 from __future__ import annotations
 
-from datetime import date
-from typing import Any
-
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .coordinator import WywozOdpadowDataUpdateCoordinator
+from .entity import WywozOdpadowEntity
 
 
 async def async_setup_entry(
@@ -23,31 +19,43 @@ async def async_setup_entry(
     """Set up the Wywóz Odpadów sensor platform."""
     coordinator: WywozOdpadowDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[SensorEntity] = []
-
-    fractions = {}
-    if coordinator.data and coordinator.data.get("fractions"):
-        fractions = coordinator.data["fractions"]
-
-    for fraction_id, fraction_data in fractions.items():
-        entities.append(
+    # Fractions that already have a sensor; a fraction that disappears keeps
+    # its sensor, which becomes unavailable until the fraction returns
+    known: set[str] = set()
+
+    @callback
+    def _async_add_new_fractions() -> None:
+        """Add sensors for fractions not seen before, without a reload."""
+        data = coordinator.data
+        if not data or not data.get("fractions"):
+            return
+        entities = [
             WywozOdpadowFractionSensor(
                 coordinator,
                 entry,
                 fraction_id,
-                fraction_data.get("name", str(fraction_id)),
+                fraction_data.name or str(fraction_id),
             )
-        )
+            for fraction_id, fraction_data in data["fractions"].items()
+            if fraction_id not in known
+        ]
+        if entities:
+            known.update(entity.fraction_id for entity in entities)
+            async_add_entities(entities)
+
+    _async_add_new_fractions()
+    # Notified on every change of the data, including fractions that are new
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_fractions))
 
-    async_add_entities(entities)
 
+class WywozOdpadowFractionSensor(WywozOdpadowEntity, SensorEntity):
+    """Representation of a Wywóz Odpadów fraction sensor.
 
-class WywozOdpadowFractionSensor(
-    CoordinatorEntity[WywozOdpadowDataUpdateCoordinator], SensorEntity
-):
-    """Representation of a Wywóz Odpadów fraction sensor."""
+    The sensor listens with its fraction id as context, so it only writes
+    state when its own fraction changed; state and attributes are built once
+    per change instead of on every state write.
+    """
 
-    _attr_has_entity_name = True
     _attr_native_unit_of_measurement = "dni"
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_icon = "mdi:trash-can"
@@ -60,80 +68,48 @@ class WywozOdpadowFractionSensor(
         fraction_name: str,
     ) -> None:
         """Initialize the fraction sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry, fraction_id)
         self._fraction_id = fraction_id
         self._attr_unique_id = f"{entry.entry_id}_fraction_{fraction_id}"
         self._attr_name = fraction_name
-        self._entry = entry
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": None,
-            "manufacturer": "Warszawa 19115",
-        }
+        self._update_from_data()
 
     @property
-    def name(self) -> str | None:
-        """Return the translated fraction name from coordinator data."""
-        if self.coordinator.data and self.coordinator.data.get("fractions"):
-            frac = self.coordinator.data["fractions"].get(self._fraction_id)
-            if frac and frac.get("name"):
-                return frac["name"]
-        return self._attr_name or self._fraction_id
+    def fraction_id(self) -> str:
+        """Return the id_frakcja of the fraction."""
+        return self._fraction_id
 
+    @property
+    def available(self) -> bool:
+        """Return False while the fraction is missing from the schedule."""
+        data = self.coordinator.data
+        return (
+            super().available
+            and data is not None
+            and self._fraction_id in data["fractions"]
+        )
+
+    @callback
     def _handle_coordinator_update(self) -> None:
-        """Update entity name from coordinator when data refreshes."""
-        if self.coordinator.data and self.coordinator.data.get("fractions"):
-            frac = self.coordinator.data["fractions"].get(self._fraction_id)
-            if frac and frac.get("name"):
-                self._attr_name = frac["name"]
+        """Update the state from the changed fraction."""
+        self._update_from_data()
         super()._handle_coordinator_update()
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        # Get address from coordinator data, fallback to entry title
-        address = None
-        if self.coordinator.data and self.coordinator.data.get("address"):
-            address = self.coordinator.data["address"]
-        else:
-            # Fallback to entry title if data not yet loaded
-            address = self._entry.title
-
-        if not address:
-            address = f"Wywóz Odpadów ({self.coordinator.address_point_id})"
-
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": address,
-            "manufacturer": "Warszawa 19115",
+    @callback
+    def _update_from_data(self) -> None:
+        """Set name, state and attributes from the fraction in the coordinator data."""
+        data = self.coordinator.data
+        fraction = data["fractions"].get(self._fraction_id) if data else None
+        if fraction is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+            return
+
+        if fraction.name:
+            self._attr_name = fraction.name
+        self._attr_native_value = fraction.days_until
+        self._attr_extra_state_attributes = {
+            "fraction_id": self._fraction_id,
+            "fraction_type": fraction.type,
+            "next_date": fraction.next_date.isoformat() if fraction.next_date else None,
         }
-
-    @property
-    def native_value(self) -> int | None:
-        """Return the state of the sensor."""
-        if not self.coordinator.data or not self.coordinator.data.get("fractions"):
-            return None
-
-        fraction = self.coordinator.data["fractions"].get(self._fraction_id)
-        if not fraction:
-            return None
-
-        return fraction.get("days_until")
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        attributes: dict[str, Any] = {}
-
-        if not self.coordinator.data or not self.coordinator.data.get("fractions"):
-            return attributes
-
-        fraction = self.coordinator.data["fractions"].get(self._fraction_id)
-        if not fraction:
-            return attributes
-
-        attributes["fraction_id"] = self._fraction_id
-        attributes["fraction_type"] = fraction.get("type")
-        attributes["next_date"] = fraction.get("next_date")
-
-        return attributes
@@ -0,0 +1,123 @@
+"""Fetch and processing telemetry per address point, shown in diagnostics."""
+from __future__ import annotations
+
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import TELEMETRY_SAMPLES
+
+
+def _percentile(values: deque[float], pct: float) -> float | None:
+    """Return the pct-th percentile of the values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Return seconds as rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+class RefreshTelemetry:
+    """Timings and outcomes of the refreshes of one address point.
+
+    Latency and processing time keep the last samples for mean and p95;
+    outcomes are counted since startup. Recording is a few attribute updates,
+    so it is always on.
+    """
+
+    def __init__(self, samples: int = TELEMETRY_SAMPLES) -> None:
+        """Initialize without samples."""
+        self._latencies: deque[float] = deque(maxlen=samples)
+        self._process_times: deque[float] = deque(maxlen=samples)
+        self.response_bytes: int | None = None
+        self.parse_time: float | None = None
+        self.events: int | None = None
+        self.fractions: int | None = None
+        self.successes = 0
+        self.unchanged = 0
+        self.not_modified = 0
+        self.failures: Counter[str] = Counter()
+        self.last_failure: str | None = None
+        self.last_success_at: datetime | None = None
+        self.last_failure_at: datetime | None = None
+
+    def record_fetch(self, latency: float, response_bytes: int | None) -> None:
+        """Add the latency and body size of a portal response."""
+        self._latencies.append(latency)
+        if response_bytes is not None:
+            self.response_bytes = response_bytes
+
+    def record_processed(
+        self, parse_time: float, process_time: float, events: int, fractions: int
+    ) -> None:
+        """Add the decode and processing time of a changed schedule."""
+        self.parse_time = parse_time
+        self._process_times.append(process_time)
+        self.events = events
+        self.fractions = fractions
+
+    def record_success(self, unchanged: bool = False, not_modified: bool = False) -> None:
+        """Count a refresh that produced good data."""
+        self.successes += 1
+        self.unchanged += unchanged
+        self.not_modified += not_modified
+        self.last_success_at = dt_util.utcnow()
+
+    def record_failure(self, kind: str) -> None:
+        """Count a failed refresh by its error kind or exception class."""
+        self.failures[kind] += 1
+        self.last_failure = kind
+        self.last_failure_at = dt_util.utcnow()
+
+    @property
+    def failure_count(self) -> int:
+        """Return the number of failed refreshes."""
+        return self.failures.total()
+
+    @property
+    def p95_latency(self) -> float | None:
+        """Return the 95th percentile fetch latency in seconds."""
+        return _percentile(self._latencies, 95)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the telemetry for diagnostics."""
+        latencies = self._latencies
+        process_times = self._process_times
+        now = dt_util.utcnow()
+        return {
+            "fetch_latency_ms": {
+                "last": _ms(latencies[-1] if latencies else None),
+                "mean": _ms(sum(latencies) / len(latencies) if latencies else None),
+                "p95": _ms(self.p95_latency),
+                "samples": len(latencies),
+            },
+            "response_bytes": self.response_bytes,
+            "parse_time_ms": _ms(self.parse_time),
+            "process_time_ms": {
+                "last": _ms(process_times[-1] if process_times else None),
+                "mean": _ms(
+                    sum(process_times) / len(process_times) if process_times else None
+                ),
+            },
+            "events": self.events,
+            "fractions": self.fractions,
+            "successes": self.successes,
+            "failures": dict(self.failures),
+            "last_failure": self.last_failure,
+            "last_failure_at": self.last_failure_at,
+            "unchanged_ratio": (
+                round(self.unchanged / self.successes, 3) if self.successes else None
+            ),
+            "not_modified": self.not_modified,
+            "seconds_since_last_success": (
+                round((now - self.last_success_at).total_seconds())
+                if self.last_success_at
+                else None
+            ),
+        }